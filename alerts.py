@@ -1,11 +1,17 @@
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 
 # ---------------- BASIC HELPERS ----------------
+# Standalone module (the API uses backend/core/alerts.py): it keeps its own
+# keep-alive session rather than importing the backend's HTTP layer.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
 def _safe_get(url: str, params: Dict[str, Any] = None) -> Any:
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _session.get(url, params=params, timeout=10)
         if resp.status_code == 200:
             return resp.json()
     except Exception:
@@ -52,11 +52,38 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+
+@st.cache_data(ttl=300, show_spinner=False)
+def suggest_places(prefix: str):
+    # served from the backend's in-memory index; never blocks the page for long
+    try:
+        resp = requests.get(
+            f"{BACKEND_URL}/places/suggest",
+            params={"q": prefix, "limit": 8},
+            timeout=2,
+        )
+        return resp.json().get("suggestions", []) if resp.status_code == 200 else []
+    except requests.RequestException:
+        return []
+
+
 st.write("")
 col_left, col_right = st.columns([2, 1])
 
 with col_left:
     place = st.text_input("📍 Search any city or country", value="Kottayam")
+    suggestions = suggest_places(place.strip()) if place.strip() else []
+    if suggestions:
+        typed = place.strip()
+        # first option keeps the lookup on exactly what was typed
+        choice = st.selectbox(
+            "Matching places",
+            [None] + suggestions,
+            format_func=lambda s: f"{typed} (as typed)" if s is None
+            else f"{s['name']}, {s['country']}" if s.get("country") else s["name"],
+        )
+        if choice is not None:
+            place = choice["query"]  # resolves to exactly the chosen place
 
 with col_right:
     st.write("")
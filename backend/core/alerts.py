@@ -1,38 +1,66 @@
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
+import os
+import threading
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from .upstream import async_get_json, get_json
+from .event_index import EventIndex, normalize_text, parse_gdacs_geometry
+from .metrics import timed_stage, cache_event
+from .singleflight import single_flight
+from .breaker import LastKnownGood, aguarded_call, get_breaker, guarded_call
 
 # ---------------- BASIC HELPERS ----------------
 
 def _safe_get(url: str, params: Dict[str, Any] = None) -> Any:
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            return resp.json()
-    except Exception:
-        return None
-    return None
+    return get_json(url, params=params)
 
 # ---------------- RELIEFWEB (DISASTERS) ----------------
 # Docs: https://apidoc.reliefweb.int/
 
-RELIEFWEB_DISASTERS_URL = "https://api.reliefweb.int/v1/disasters"
+RELIEFWEB_DISASTERS_URL = os.getenv("RELIEFWEB_DISASTERS_URL", "https://api.reliefweb.int/v1/disasters")
+
+def _reliefweb_params(query: str) -> Dict[str, Any]:
+    return {
+        "appname": "gdis-climate-risk",
+        "profile": "full",
+        "preset": "latest",
+        "limit": 50,
+        "query[value]": query,
+    }
+
+
+def _reliefweb_probe() -> bool:
+    return get_json(RELIEFWEB_DISASTERS_URL, params=dict(_reliefweb_params("flood"), limit=1)) is not None
 
-def _reliefweb_recent_flood_titles(query: str, window_days: int = 7) -> List[str]:
+
+# slow / failing ReliefWeb → answer from the last good response per query
+_reliefweb_breaker = get_breaker("reliefweb", probe=_reliefweb_probe)
+_reliefweb_lkg = LastKnownGood("reliefweb_lkg")
+
+
+def _reliefweb_recent_flood_titles(query: str, window_days: int = 7) -> Tuple[List[str], bool]:
     """
     Search ReliefWeb disasters for the last `window_days` that match the query
-    and look like flood / heavy rain events.
+    and look like flood / heavy rain events. Returns (titles, stale); stale
+    titles come from the last good response while ReliefWeb is failing.
     """
-    data = _safe_get(
-        RELIEFWEB_DISASTERS_URL,
-        params={
-            "appname": "gdis-climate-risk",
-            "profile": "full",
-            "preset": "latest",
-            "limit": 50,
-            "query[value]": query,
-        },
+    data, stale = guarded_call(
+        _reliefweb_breaker, _reliefweb_lkg, query.lower(),
+        lambda: _safe_get(RELIEFWEB_DISASTERS_URL, params=_reliefweb_params(query)),
     )
+    return _parse_reliefweb_titles(data, window_days), stale
+
+
+async def _reliefweb_recent_flood_titles_async(query: str, window_days: int = 7) -> Tuple[List[str], bool]:
+    data, stale = await aguarded_call(
+        _reliefweb_breaker, _reliefweb_lkg, query.lower(),
+        lambda: async_get_json(RELIEFWEB_DISASTERS_URL, params=_reliefweb_params(query)),
+    )
+    return _parse_reliefweb_titles(data, window_days), stale
+
+
+def _parse_reliefweb_titles(data: Any, window_days: int) -> List[str]:
     if not data or "data" not in data:
         return []
 
@@ -57,6 +85,9 @@ def _reliefweb_recent_flood_titles(query: str, window_days: int = 7) -> List[str
             dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
         except Exception:
             continue
+        if dt.tzinfo is not None:
+            # cutoff is naive UTC
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
 
         if dt < cutoff:
             continue
@@ -72,12 +103,13 @@ def _reliefweb_recent_flood_titles(query: str, window_days: int = 7) -> List[str
 # ---------------- GDACS (FLOOD EVENTS) ----------------
 # Docs: https://www.gdacs.org/gdacsapi/swagger/index.html
 
-GDACS_SEARCH_URL = "https://www.gdacs.org/gdacsapi/api/events/geteventlist/SEARCH"
+GDACS_SEARCH_URL = os.getenv("GDACS_SEARCH_URL", "https://www.gdacs.org/gdacsapi/api/events/geteventlist/SEARCH")
 
-def _gdacs_recent_flood_titles(window_days: int = 7) -> List[Dict[str, Any]]:
+def _fetch_gdacs_events(window_days: int = 7) -> Optional[List[Dict[str, Any]]]:
     """
     Get global flood events from GDACS in the last `window_days` days.
-    Returns list of dicts with name + country.
+    Returns list of dicts with name, country, iso3 and optional point/bbox,
+    or None if the feed failed.
     """
     todate = datetime.utcnow().date()
     fromdate = todate - timedelta(days=window_days)
@@ -89,8 +121,8 @@ def _gdacs_recent_flood_titles(window_days: int = 7) -> List[Dict[str, Any]]:
     }
 
     data = _safe_get(GDACS_SEARCH_URL, params=params)
-    if not data:
-        return []
+    if data is None:
+        return None
 
     # GDACS /SEARCH returns GeoJSON-like structure with "features"
     features = data.get("features") or data.get("Features") or []
@@ -102,46 +134,133 @@ def _gdacs_recent_flood_titles(window_days: int = 7) -> List[Dict[str, Any]]:
         country = props.get("country") or ""
         if not name:
             continue
+        point, bbox = parse_gdacs_geometry(f)
         events.append(
             {
                 "name": name,
                 "country": country,
+                "iso3": props.get("iso3") or "",
+                "point": point,
+                "bbox": bbox,
             }
         )
     return events
 
 
-# ---------------- PUBLIC API USED BY RISK ENGINE ----------------
+# ---------------- GDACS FEED CACHE ----------------
+# The global flood list is identical for every location, so one process-wide
+# copy is refreshed in the background and requests only read the snapshot.
+
+GDACS_WINDOW_DAYS = 7
+GDACS_REFRESH_SECONDS = int(os.getenv("GDACS_REFRESH_SECONDS", "600"))
+GDACS_RETRY_SECONDS = int(os.getenv("GDACS_RETRY_SECONDS", "60"))
+# a GDACS event reported within this distance of the location counts as local
+EVENT_POINT_RADIUS_KM = float(os.getenv("EVENT_POINT_RADIUS_KM", "50"))
+# snapshot older than this → the last refreshes failed; signals mark GDACS stale
+GDACS_STALE_SECONDS = float(os.getenv("GDACS_STALE_SECONDS", str(2 * GDACS_REFRESH_SECONDS)))
+
+
+class _GdacsFeedCache:
+    def __init__(self, window_days: int, refresh_seconds: int, retry_seconds: int):
+        self.window_days = window_days
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self._index = EventIndex([])
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """Fetch the feed once; on failure the previous snapshot is kept."""
+        events = _fetch_gdacs_events(self.window_days)
+        if events is None:
+            cache_event("gdacs_feed", "refresh_failed")
+            return False
+        cache_event("gdacs_feed", "refresh_ok")
+        # index is built outside the lock; readers swap to it atomically
+        index = EventIndex(events)
+        with self._lock:
+            self._index = index
+            self._fetched_at = time.time()
+        return True
 
-def get_flood_event_signal(location_name: str, country_name: str) -> Dict[str, Any]:
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            ok = self.refresh()
+            self._stop.wait(self.refresh_seconds if ok else self.retry_seconds)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="gdacs-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def snapshot(self) -> EventIndex:
+        # never blocks on the network; starts the refresher on first use
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            return self._index
+
+    def age_seconds(self) -> Optional[float]:
+        with self._lock:
+            return None if self._fetched_at is None else time.time() - self._fetched_at
+
+
+_gdacs_feed = _GdacsFeedCache(GDACS_WINDOW_DAYS, GDACS_REFRESH_SECONDS, GDACS_RETRY_SECONDS)
+
+
+def start_gdacs_refresher() -> None:
+    _gdacs_feed.start()
+
+
+def stop_gdacs_refresher() -> None:
+    _gdacs_feed.stop()
+
+
+def refresh_gdacs_feed() -> bool:
+    """Synchronous one-off refresh, for batch jobs that run without the refresher."""
+    return _gdacs_feed.refresh()
+
+
+def fetch_gdacs_snapshot() -> Optional[EventIndex]:
     """
-    Combines ReliefWeb + GDACS into a simple signal:
-    - city_alert: there were flood-like events mentioning the city
-    - country_alert: there were events mentioning the country
-    - sources: list of up to 5 titles for debugging / UI
-    - window_days: the time window used
+    One synchronous fetch of the feed, indexed, or None if it failed. For
+    batch jobs: unlike the shared cache, this never starts the refresher.
     """
-    location_name = (location_name or "").strip()
-    country_name = (country_name or "").strip()
+    events = _fetch_gdacs_events(GDACS_WINDOW_DAYS)
+    return None if events is None else EventIndex(events)
 
-    WINDOW_DAYS = 7
 
-    # ReliefWeb city + country search
-    rw_city_titles = _reliefweb_recent_flood_titles(location_name, window_days=WINDOW_DAYS) if location_name else []
-    rw_country_titles = _reliefweb_recent_flood_titles(country_name, window_days=WINDOW_DAYS) if country_name else []
-
-    # GDACS global floods
-    gdacs_events = _gdacs_recent_flood_titles(window_days=WINDOW_DAYS)
-    gdacs_city_hits = []
-    gdacs_country_hits = []
-
-    for ev in gdacs_events:
-        name = (ev.get("name") or "").lower()
-        country = (ev.get("country") or "").lower()
-        if location_name and location_name.lower() in name:
-            gdacs_city_hits.append(ev["name"])
-        if country_name and country_name.lower() in (country or name):
-            gdacs_country_hits.append(ev["name"])
+# ---------------- PUBLIC API USED BY RISK ENGINE ----------------
+
+def _combine_signal(
+    location_name: str,
+    country_name: str,
+    rw_city_titles: List[str],
+    rw_country_titles: List[str],
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    reliefweb_stale: bool = False,
+    gdacs: Optional[EventIndex] = None,
+) -> Dict[str, Any]:
+    # GDACS global floods: the caller's snapshot, else the shared one
+    # refreshed in the background
+    index = gdacs if gdacs is not None else _gdacs_feed.snapshot()
+    city_ids = index.match_place(location_name) if location_name else set()
+    if lat is not None and lon is not None:
+        # reported within the radius, or the event's affected area covers the place
+        city_ids |= index.events_near(lat, lon, EVENT_POINT_RADIUS_KM) | index.events_covering(lat, lon)
+    country_ids = index.match_country(country_name) if country_name else set()
+
+    gdacs_city_hits = index.names(city_ids)
+    gdacs_country_hits = index.names(country_ids)
 
     city_alert = bool(rw_city_titles or gdacs_city_hits)
     country_alert = bool(rw_country_titles or gdacs_country_hits)
@@ -151,10 +270,128 @@ def get_flood_event_signal(location_name: str, country_name: str) -> Dict[str, A
     )
     sources_combined = list(dict.fromkeys(sources_combined))[:5]  # unique, max 5
 
-    return {
+    signal = {
         "city_alert": city_alert,
         "country_alert": country_alert,
         "titles": sources_combined,
-        "window_days": WINDOW_DAYS,
+        "window_days": GDACS_WINDOW_DAYS,
         "sources_used": ["ReliefWeb", "GDACS"],
     }
+
+    # degraded providers: data is last-known-good (or missing), not live
+    stale_sources = []
+    if reliefweb_stale:
+        stale_sources.append("ReliefWeb")
+    gdacs_age = 0.0 if gdacs is not None else _gdacs_feed.age_seconds()
+    if gdacs_age is None or gdacs_age > GDACS_STALE_SECONDS:
+        stale_sources.append("GDACS")
+    if stale_sources:
+        signal["stale"] = True
+        signal["stale_sources"] = stale_sources
+    return signal
+
+
+def _signal_key(
+    location_name: str,
+    country_name: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+):
+    # same place, spelled or cased differently, shares one in-flight lookup
+    return (
+        normalize_text(location_name or ""),
+        normalize_text(country_name or ""),
+        None if lat is None else round(lat, 2),
+        None if lon is None else round(lon, 2),
+    )
+
+
+@timed_stage("alerts")
+@single_flight("alerts", key=_signal_key)
+def get_flood_event_signal(
+    location_name: str,
+    country_name: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Combines ReliefWeb + GDACS into a simple signal:
+    - city_alert: there were flood-like events mentioning the city
+    - country_alert: there were events mentioning the country
+    - sources: list of up to 5 titles for debugging / UI
+    - window_days: the time window used
+    - stale / stale_sources: only present when a provider is degraded and
+      its part of the signal is last-known-good (or missing) data
+    `lat`/`lon`, when known, also match GDACS events reported nearby.
+    """
+    location_name = (location_name or "").strip()
+    country_name = (country_name or "").strip()
+
+    # ReliefWeb city + country search
+    rw_city_titles, city_stale = (
+        _reliefweb_recent_flood_titles(location_name, window_days=GDACS_WINDOW_DAYS) if location_name else ([], False)
+    )
+    rw_country_titles, country_stale = (
+        _reliefweb_recent_flood_titles(country_name, window_days=GDACS_WINDOW_DAYS) if country_name else ([], False)
+    )
+
+    return _combine_signal(location_name, country_name, rw_city_titles, rw_country_titles, lat, lon,
+                           reliefweb_stale=city_stale or country_stale)
+
+
+@timed_stage("alerts")
+@single_flight("alerts_async", key=_signal_key)
+async def get_flood_event_signal_async(
+    location_name: str,
+    country_name: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Same signal as `get_flood_event_signal`, ReliefWeb queries run concurrently."""
+    location_name = (location_name or "").strip()
+    country_name = (country_name or "").strip()
+
+    async def _none() -> Tuple[List[str], bool]:
+        return [], False
+
+    (rw_city_titles, city_stale), (rw_country_titles, country_stale) = await asyncio.gather(
+        _reliefweb_recent_flood_titles_async(location_name, GDACS_WINDOW_DAYS) if location_name else _none(),
+        _reliefweb_recent_flood_titles_async(country_name, GDACS_WINDOW_DAYS) if country_name else _none(),
+    )
+
+    return _combine_signal(location_name, country_name, rw_city_titles, rw_country_titles, lat, lon,
+                           reliefweb_stale=city_stale or country_stale)
+
+
+def cached_flood_event_signal(
+    location_name: str,
+    country_name: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Any]:
+    """GDACS matches from the cached feed only; never touches the network."""
+    return _combine_signal((location_name or "").strip(), (country_name or "").strip(), [], [], lat, lon)
+
+
+def snapshot_flood_event_signal(
+    gdacs: EventIndex,
+    location_name: str,
+    country_name: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Any]:
+    """GDACS matches against a `fetch_gdacs_snapshot` index; never touches the network."""
+    return _combine_signal((location_name or "").strip(), (country_name or "").strip(), [], [], lat, lon,
+                           gdacs=gdacs)
+
+
+def gdacs_only_flood_event_signal(
+    location_name: str,
+    country_name: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Fallback when ReliefWeb did not answer in time: cached GDACS matches only."""
+    signal = cached_flood_event_signal(location_name, country_name, lat, lon)
+    signal["timed_out"] = True
+    return signal
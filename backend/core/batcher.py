@@ -0,0 +1,136 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import Counter, Histogram, register
+
+# ---------------- MICRO-BATCHING INFERENCE ----------------
+# Concurrent requests each need one model row. Rows are queued; a dispatcher
+# thread takes whatever is waiting, keeps collecting for up to
+# INFERENCE_MAX_WAIT_MS or until INFERENCE_MAX_BATCH rows, runs one predict
+# over the stacked matrix and resolves every caller's future. Per-call
+# overhead (DMatrix construction, thread fan-out) is paid once per batch.
+
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "1") == "1"
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+# 0 = no waiting: batch only rows that queued while the previous predict ran
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "2"))
+
+BATCH_ROWS = register(Histogram(
+    "gdis_inference_batch_rows", "Rows per batched model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+))
+BATCH_FILL = register(Histogram(
+    "gdis_inference_batch_fill_ratio", "Rows per batched model call / INFERENCE_MAX_BATCH",
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+))
+BATCH_QUEUE_SECONDS = register(Histogram(
+    "gdis_inference_queue_seconds", "Time a row waited in the queue before its batch ran",
+))
+BATCH_FLUSHES = register(Counter(
+    "gdis_inference_batches_total", "Batched model calls by flush reason (full, timeout, drained)",
+))
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, name: str, predict: Callable[[np.ndarray], List[Any]], max_batch: int, max_wait: float):
+        self.name = name
+        self.predict = predict
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def submit(self, row: np.ndarray) -> Future:
+        """Queue one feature row; the future resolves to its prediction."""
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((row, fut, time.perf_counter()))
+        return fut
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Score what is queued, then end the dispatcher thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        # rows submitted after the stop marker are never scored → fail them
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError(f"batcher {self.name} stopped"))
+
+    # ---------- dispatcher ----------
+
+    def _collect(self, first: Tuple) -> Tuple[List[Tuple], str, bool]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.perf_counter()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return batch, "timeout" if self.max_wait > 0 else "drained", False
+            if item is _STOP:
+                return batch, "drained", True
+            batch.append(item)
+        return batch, "full", False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, reason, stopping = self._collect(first)
+            try:
+                self._dispatch(batch, reason)
+            except Exception as e:
+                # the loop must outlive any one bad batch, or later callers hang
+                print(f"⚠ Batcher {self.name}: batch failed: {e}")
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def _dispatch(self, batch: List[Tuple], reason: str) -> None:
+        # callers that gave up (asyncio.wrap_future forwards cancellation)
+        # are dropped here; the rest can no longer be cancelled
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, queued_at in batch:
+            BATCH_QUEUE_SECONDS.observe(started - queued_at, batcher=self.name)
+        BATCH_ROWS.observe(len(batch), batcher=self.name)
+        BATCH_FILL.observe(len(batch) / self.max_batch, batcher=self.name)
+        BATCH_FLUSHES.inc(batcher=self.name, reason=reason)
+
+        try:
+            results = self.predict(np.vstack([row for row, _, _ in batch]))
+        except Exception as e:
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            return
+        for (_, fut, _), result in zip(batch, results):
+            fut.set_result(result)
@@ -0,0 +1,180 @@
+"""
+Per-provider circuit breakers with last-known-good fallbacks.
+
+After BREAKER_FAILURES consecutive failures a provider's breaker opens:
+requests stop calling it and are answered from the last good response for
+the same query (marked stale by the caller) instead of each waiting out the
+full upstream timeout. While open, a background thread probes the provider
+every BREAKER_PROBE_SECONDS and closes the breaker once it answers again.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import Counter, cache_event, register
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_PROBE_SECONDS = float(os.getenv("BREAKER_PROBE_SECONDS", "30"))
+LKG_MAX_ENTRIES = int(os.getenv("LKG_MAX_ENTRIES", "2048"))
+LKG_MAX_AGE_SECONDS = float(os.getenv("LKG_MAX_AGE_SECONDS", str(24 * 3600)))
+
+CLOSED, OPEN = "closed", "open"
+
+BREAKER_TRANSITIONS = register(Counter(
+    "gdis_breaker_transitions_total",
+    "Circuit breaker state changes by provider and new state (open, closed)",
+))
+BREAKER_PROBES = register(Counter(
+    "gdis_breaker_probes_total",
+    "Background recovery probes by provider and outcome (ok, failed)",
+))
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        probe: Optional[Callable[[], bool]] = None,
+        failure_threshold: int = BREAKER_FAILURES,
+        probe_seconds: float = BREAKER_PROBE_SECONDS,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_seconds = probe_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """True if requests may call the provider right now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self.probe is None and time.monotonic() - self._opened_at >= self.probe_seconds:
+                # no background probe: let this one request through as the trial
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._failures = 0
+                if self._state == OPEN:
+                    self._transition(CLOSED)
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+                self._start_prober()
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        BREAKER_TRANSITIONS.inc(provider=self.name, state=state)
+        print(f"⚡ {self.name} circuit {state}")
+
+    # ---------- background recovery ----------
+
+    def _start_prober(self) -> None:
+        if self.probe is None or (self._prober is not None and self._prober.is_alive()):
+            return
+        self._prober = threading.Thread(target=self._probe_loop, name=f"probe-{self.name}", daemon=True)
+        self._prober.start()
+
+    def _probe_loop(self) -> None:
+        while self._state == OPEN:
+            time.sleep(self.probe_seconds)
+            try:
+                ok = bool(self.probe())
+            except Exception:
+                ok = False
+            BREAKER_PROBES.inc(provider=self.name, outcome="ok" if ok else "failed")
+            if ok:
+                self.record(True)
+
+
+class LastKnownGood:
+    """Bounded LRU of the last successful response per query key."""
+
+    def __init__(self, name: str, max_entries: int = LKG_MAX_ENTRIES, max_age: float = LKG_MAX_AGE_SECONDS):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > self.max_age:
+                cache_event(self.name, "stale_miss")
+                return None
+            cache_event(self.name, "stale_hit")
+            return entry[0]
+
+
+def guarded_call(
+    breaker: CircuitBreaker,
+    lkg: LastKnownGood,
+    key: Hashable,
+    fetch: Callable[[], Any],
+) -> Tuple[Any, bool]:
+    """
+    (data, stale). Calls `fetch` unless the breaker is open; a None result
+    counts as a failure. On failure or short-circuit the last-known-good
+    value for `key` is returned with stale=True (None if there is none).
+    """
+    if breaker.allow():
+        data = fetch()
+        breaker.record(data is not None)
+        if data is not None:
+            lkg.put(key, data)
+            return data, False
+    return lkg.get(key), True
+
+
+async def aguarded_call(
+    breaker: CircuitBreaker,
+    lkg: LastKnownGood,
+    key: Hashable,
+    fetch: Callable[[], Awaitable[Any]],
+) -> Tuple[Any, bool]:
+    """Async counterpart of `guarded_call`."""
+    if breaker.allow():
+        data = await fetch()
+        breaker.record(data is not None)
+        if data is not None:
+            lkg.put(key, data)
+            return data, False
+    return lkg.get(key), True
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, probe: Optional[Callable[[], bool]] = None) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, probe=probe)
+    return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    return {name: breaker.state for name, breaker in _breakers.items()}
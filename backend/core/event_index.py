@@ -0,0 +1,154 @@
+import math
+import re
+import unicodedata
+from typing import Dict, Any, List, Optional, Set, Tuple
+import numpy as np
+
+# ---------------- DISASTER EVENT INDEX ----------------
+# Built once per GDACS feed refresh. Place and country lookups become
+# dictionary/set operations instead of substring scans over every event,
+# and whole-token matching avoids false hits such as "india" in "indiana".
+
+# words that say nothing about *where* an event is
+STOPWORDS = {
+    "flood", "floods", "flooding", "flash", "event", "events", "heavy", "rain",
+    "rains", "the", "of", "in", "and", "a", "an", "on", "at", "to",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in normalize_text(text).split() if t not in STOPWORDS]
+
+
+def _split_countries(country: str) -> List[str]:
+    # GDACS lists multi-country events as "India, Bangladesh"
+    return [normalize_text(c) for c in re.split(r"[,;/]", country or "") if normalize_text(c)]
+
+
+class EventIndex:
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.events = events
+        self.token_postings: Dict[str, Set[int]] = {}
+        self.country_postings: Dict[str, Set[int]] = {}
+        self.iso3_postings: Dict[str, Set[int]] = {}
+        self._no_country: Set[int] = set()
+
+        point_ids, lats, lons = [], [], []
+        bbox_ids, bboxes = [], []
+
+        for i, ev in enumerate(events):
+            for token in tokenize(ev.get("name", "")):
+                self.token_postings.setdefault(token, set()).add(i)
+
+            countries = _split_countries(ev.get("country", ""))
+            for c in countries:
+                self.country_postings.setdefault(c, set()).add(i)
+            if not countries:
+                self._no_country.add(i)
+
+            for code in re.split(r"[,;\s]+", (ev.get("iso3") or "").upper()):
+                if code:
+                    self.iso3_postings.setdefault(code, set()).add(i)
+
+            point = ev.get("point")
+            if point is not None:
+                point_ids.append(i)
+                lats.append(point[0])
+                lons.append(point[1])
+            bbox = ev.get("bbox")
+            if bbox is not None:
+                bbox_ids.append(i)
+                bboxes.append(bbox)
+
+        self._point_ids = np.array(point_ids, dtype=np.int64)
+        self._point_lat = np.radians(np.array(lats, dtype=np.float64))
+        self._point_lon = np.radians(np.array(lons, dtype=np.float64))
+        self._bbox_ids = np.array(bbox_ids, dtype=np.int64)
+        # (min_lat, min_lon, max_lat, max_lon)
+        self._bboxes = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def match_place(self, place: str) -> Set[int]:
+        """Events whose name contains every token of `place`."""
+        tokens = tokenize(place)
+        if not tokens:
+            return set()
+        postings = [self.token_postings.get(t) for t in tokens]
+        if any(p is None for p in postings):
+            return set()
+        postings.sort(key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def match_country(self, country: str) -> Set[int]:
+        """
+        Events listing `country` (name or ISO3 code). Events without a
+        country field fall back to their name, as the feed often omits it.
+        """
+        if not country:
+            return set()
+        hits = set(self.country_postings.get(normalize_text(country), ()))
+        if len(country.strip()) == 3:
+            hits |= self.iso3_postings.get(country.strip().upper(), set())
+        hits |= self.match_place(country) & self._no_country
+        return hits
+
+    def events_near(self, lat: float, lon: float, radius_km: float) -> Set[int]:
+        """Events whose reported point lies within `radius_km` (haversine)."""
+        if self._point_ids.size == 0:
+            return set()
+        lat_r, lon_r = math.radians(lat), math.radians(lon)
+        a = (
+            np.sin((self._point_lat - lat_r) / 2) ** 2
+            + np.cos(lat_r) * np.cos(self._point_lat) * np.sin((self._point_lon - lon_r) / 2) ** 2
+        )
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        return set(self._point_ids[dist <= radius_km].tolist())
+
+    def events_covering(self, lat: float, lon: float) -> Set[int]:
+        """Events whose GDACS bounding box contains the point."""
+        if self._bbox_ids.size == 0:
+            return set()
+        b = self._bboxes
+        in_lon = np.where(
+            b[:, 1] <= b[:, 3],
+            (b[:, 1] <= lon) & (lon <= b[:, 3]),
+            (lon >= b[:, 1]) | (lon <= b[:, 3]),  # box crosses the antimeridian
+        )
+        inside = (b[:, 0] <= lat) & (lat <= b[:, 2]) & in_lon
+        return set(self._bbox_ids[inside].tolist())
+
+    def names(self, ids: Set[int]) -> List[str]:
+        # feed order keeps the output stable between calls
+        return [self.events[i]["name"] for i in sorted(ids)]
+
+
+def parse_gdacs_geometry(feature: Dict[str, Any]) -> Tuple[Optional[Tuple[float, float]], Optional[Tuple[float, float, float, float]]]:
+    """
+    (lat, lon) point and (min_lat, min_lon, max_lat, max_lon) bbox from a
+    GDACS GeoJSON feature; either may be None.
+    """
+    point = None
+    geometry = feature.get("geometry") or {}
+    if geometry.get("type") == "Point":
+        coords = geometry.get("coordinates") or []
+        if len(coords) >= 2:
+            point = (float(coords[1]), float(coords[0]))
+
+    bbox = None
+    raw = feature.get("bbox") or (feature.get("properties") or {}).get("bbox")
+    if isinstance(raw, (list, tuple)) and len(raw) == 4:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in raw)
+        bbox = (min_lat, min_lon, max_lat, max_lon)
+    return point, bbox
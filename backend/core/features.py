@@ -0,0 +1,142 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Rolling-window feature engine over Open-Meteo hourly history.
+# Forecast requests ask for PAST_DAYS of history, so the "last 1/3/7 days"
+# features are true 24/72/168-hour windows ending at the current hour.
+# Many locations are padded into one (n_locations, n_hours) matrix and every
+# window is computed for all of them at once from a single cumulative sum.
+
+PAST_DAYS = int(os.getenv("WEATHER_PAST_DAYS", "7"))
+
+RAIN_WINDOWS = {"rain_last_1d": 24, "rain_last_3d": 72, "rain_last_7d": 168}
+STATS_WINDOW_HOURS = 24
+
+DEFAULT_HUMIDITY = 60.0
+DEFAULT_ELEVATION = 150.0
+
+FEATURE_NAMES = [
+    "rain_last_1d", "rain_last_3d", "rain_last_7d",
+    "rain_max_1h_24h",
+    "humidity", "humidity_mean_24h",
+    "gust_max_24h",
+    "wind_speed", "elevation",
+]
+
+
+def _current_index(weather: Dict[str, Any], n_hours: int) -> int:
+    """Index of the current hour in `hourly.time`; the last sample if unknown."""
+    times = (weather.get("hourly") or {}).get("time") or []
+    now = (weather.get("current_weather") or {}).get("time")
+    if now and times:
+        # last hourly slot at or before now; current_weather may be quarter-hourly
+        idx = int(np.searchsorted(np.asarray(times, dtype="U16"), now[:16], side="right")) - 1
+        if 0 <= idx < n_hours and times[idx][:13] == now[:13]:
+            return idx
+    return n_hours - 1
+
+
+def _stack(weather_list: List[Dict[str, Any]], key: str, n_hours: int) -> np.ndarray:
+    """
+    (n_locations, n_hours) float matrix, NaN where a series is short or null.
+    Hours past `n_hours` (the precipitation axis) are dropped.
+    """
+    out = np.full((len(weather_list), n_hours), np.nan)
+    for i, weather in enumerate(weather_list):
+        series = ((weather.get("hourly") or {}).get(key) or [])[:n_hours]
+        if series:
+            row = np.array([np.nan if v is None else v for v in series], dtype=float)
+            out[i, :len(row)] = row
+    return out
+
+
+def _padded_cumsum(values: np.ndarray) -> np.ndarray:
+    """Row-wise cumulative sum with a leading 0 column (NaN counts as 0)."""
+    return np.concatenate(
+        [np.zeros((len(values), 1)), np.cumsum(np.nan_to_num(values), axis=1)], axis=1
+    )
+
+
+def _window_sum(csum: np.ndarray, end: np.ndarray, hours: int) -> np.ndarray:
+    """Sum of the `hours` samples ending at `end` (inclusive), per row, from `_padded_cumsum`."""
+    rows = np.arange(len(csum))
+    start = np.maximum(end + 1 - hours, 0)
+    return csum[rows, end + 1] - csum[rows, start]
+
+
+def _window_mask(n_rows: int, n_hours: int, end: np.ndarray, hours: int) -> np.ndarray:
+    idx = np.arange(n_hours)[None, :]
+    return (idx <= end[:, None]) & (idx > end[:, None] - hours)
+
+
+def _masked(values: np.ndarray, mask: np.ndarray, reduce, default: float) -> np.ndarray:
+    picked = np.where(mask, values, np.nan)
+    valid = ~np.isnan(picked).all(axis=1)
+    out = np.full(len(values), default)
+    if valid.any():
+        out[valid] = reduce(picked[valid], axis=1)
+    return out
+
+
+def feature_matrix(
+    weather_list: List[Dict[str, Any]],
+    elevations: Optional[List[float]] = None,
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Features for many forecast responses at once.
+    Returns (FEATURE_NAMES, float32 matrix of shape (len(weather_list), n_features)).
+    """
+    n = len(weather_list)
+    if n == 0:
+        return FEATURE_NAMES, np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+
+    n_hours = max(
+        (len((w.get("hourly") or {}).get("precipitation") or []) for w in weather_list),
+        default=0,
+    )
+    n_hours = max(n_hours, 1)
+    end = np.array([_current_index(w, n_hours) for w in weather_list])
+    rows = np.arange(n)
+
+    rain = _stack(weather_list, "precipitation", n_hours)
+    humidity = _stack(weather_list, "relativehumidity_2m", n_hours)
+    gusts = _stack(weather_list, "windgusts_10m", n_hours)
+    stats_mask = _window_mask(n, n_hours, end, STATS_WINDOW_HOURS)
+
+    rain_csum = _padded_cumsum(rain)  # one pass; every window is two lookups
+    columns = {name: _window_sum(rain_csum, end, hours) for name, hours in RAIN_WINDOWS.items()}
+    columns["rain_max_1h_24h"] = _masked(rain, stats_mask, np.nanmax, 0.0)
+
+    humidity_mean = _masked(humidity, stats_mask, np.nanmean, DEFAULT_HUMIDITY)
+    humidity_now = humidity[rows, end]
+    columns["humidity"] = np.where(np.isnan(humidity_now), humidity_mean, humidity_now)
+    columns["humidity_mean_24h"] = humidity_mean
+    columns["gust_max_24h"] = _masked(gusts, stats_mask, np.nanmax, 0.0)
+
+    columns["wind_speed"] = np.array(
+        [(w.get("current_weather") or {}).get("windspeed") or 0.0 for w in weather_list], dtype=float
+    )
+    columns["elevation"] = (
+        np.asarray(elevations, dtype=float) if elevations is not None else np.full(n, DEFAULT_ELEVATION)
+    )
+
+    matrix = np.column_stack([columns[name] for name in FEATURE_NAMES]).astype(np.float32)
+    return FEATURE_NAMES, matrix
+
+
+def feature_dicts(names: List[str], matrix: np.ndarray) -> List[Dict[str, float]]:
+    """Per-location feature dicts (as returned in API payloads) from a matrix."""
+    return [
+        {name: round(float(v), 2) for name, v in zip(names, row)}
+        for row in matrix
+    ]
+
+
+def extract_features_batch(weather_list: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    return feature_dicts(*feature_matrix(weather_list))
+
+
+def extract_features(weather_data: Dict[str, Any]) -> Dict[str, float]:
+    return extract_features_batch([weather_data])[0]
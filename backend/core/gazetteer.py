@@ -0,0 +1,227 @@
+"""
+Offline gazetteer: place-name → coordinates without a network call.
+
+Built once from a GeoNames-style dump by `build_gazetteer.py`, stored as
+
+    keys.bin          normalized names, UTF-8, concatenated in sorted order
+    key_offsets.npy   int64 (n_keys + 1) byte offsets into keys.bin
+    key_place.npy     int32 (n_keys) → place row
+    lat.npy lon.npy   float32 (n_places)
+    population.npy    int64 (n_places)
+    country.npy       uint16 (n_places) → countries.json [[code, name], ...]
+    names.bin         display names, concatenated; name_offsets.npy as above
+    meta.json         counts and build info (written last)
+
+and opened with mmap: startup maps the files, lookups binary-search the
+sorted key table, and worker processes share the pages through the OS page
+cache. Equal keys are sorted by descending population, so the first match
+for a duplicate name ("paris", "kochi") is the most populous place.
+"""
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .event_index import normalize_text
+from .model_store import atomic_write
+
+DEFAULT_GAZETTEER_DIR = Path(__file__).resolve().parent.parent / "gazetteer"
+GAZETTEER_DIR = Path(os.getenv("GAZETTEER_DIR", str(DEFAULT_GAZETTEER_DIR)))
+# entries examined by one prefix search before ranking by population
+PREFIX_SCAN_MAX = int(os.getenv("GAZETTEER_PREFIX_SCAN_MAX", "5000"))
+
+
+def normalize_name(text: str) -> str:
+    # accents folded, punctuation dropped: "São Paulo" / "sao-paulo" → "sao paulo"
+    return normalize_text(text)
+
+
+# ---------------- BUILD ----------------
+
+def build_gazetteer(
+    places: Iterable[Tuple[str, float, float, str, str, int, List[str]]],
+    out_dir: Path,
+    source: str = "",
+) -> Dict[str, Any]:
+    """
+    `places` yields (display_name, lat, lon, country_code, country_name,
+    population, names) where `names` are all spellings to index (name,
+    ascii name, alternates).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    display: List[bytes] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    pops: List[int] = []
+    country_ids: List[int] = []
+    countries: Dict[Tuple[str, str], int] = {}
+    keyed: List[Tuple[bytes, int, int]] = []   # (key, -population, place)
+
+    for name, lat, lon, country_code, country_name, population, names in places:
+        place = len(display)
+        display.append(name.encode("utf-8"))
+        lats.append(lat)
+        lons.append(lon)
+        pops.append(population)
+        country_ids.append(countries.setdefault((country_code, country_name), len(countries)))
+        for key in {normalize_name(n) for n in names}:
+            if key:
+                keyed.append((key.encode("utf-8"), -population, place))
+
+    # byte order == code point order for UTF-8, so bisecting bytes is consistent
+    keyed.sort()
+
+    key_offsets = np.zeros(len(keyed) + 1, dtype=np.int64)
+    np.cumsum([len(k) for k, _, _ in keyed], out=key_offsets[1:])
+    name_offsets = np.zeros(len(display) + 1, dtype=np.int64)
+    np.cumsum([len(n) for n in display], out=name_offsets[1:])
+
+    def _save(name: str, array: np.ndarray) -> None:
+        atomic_write(out_dir / name, lambda tmp: np.save(tmp, array))
+
+    def _write_bytes(name: str, chunks: Iterable[bytes]) -> None:
+        def write(tmp: Path) -> None:
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.write(b"\0")  # mmap of an empty file fails; keep one pad byte
+        atomic_write(out_dir / name, write)
+
+    _write_bytes("keys.bin", (k for k, _, _ in keyed))
+    _save("key_offsets.npy", key_offsets)
+    _save("key_place.npy", np.array([p for _, _, p in keyed], dtype=np.int32))
+    _write_bytes("names.bin", display)
+    _save("name_offsets.npy", name_offsets)
+    _save("lat.npy", np.array(lats, dtype=np.float32))
+    _save("lon.npy", np.array(lons, dtype=np.float32))
+    _save("population.npy", np.array(pops, dtype=np.int64))
+    _save("country.npy", np.array(country_ids, dtype=np.uint16))
+    atomic_write(out_dir / "countries.json", lambda tmp: tmp.write_text(json.dumps([list(c) for c in countries])))
+
+    meta = {"places": len(display), "keys": len(keyed), "countries": len(countries), "source": source}
+    # meta.json last: a directory without it is an unfinished build
+    atomic_write(out_dir / "meta.json", lambda tmp: tmp.write_text(json.dumps(meta, indent=2)))
+    return meta
+
+
+# ---------------- QUERY ----------------
+
+class Gazetteer:
+    def __init__(self, root: Path):
+        self.root = root
+        self.meta = json.loads((root / "meta.json").read_text())
+        self._keys = self._map_bytes(root / "keys.bin")
+        self._names = self._map_bytes(root / "names.bin")
+        self._key_offsets = self._int64_view("key_offsets.npy")
+        self.key_place = np.load(root / "key_place.npy", mmap_mode="r")
+        self.name_offsets = np.load(root / "name_offsets.npy", mmap_mode="r")
+        self.lat = np.load(root / "lat.npy", mmap_mode="r")
+        self.lon = np.load(root / "lon.npy", mmap_mode="r")
+        self.population = np.load(root / "population.npy", mmap_mode="r")
+        self.country = np.load(root / "country.npy", mmap_mode="r")
+        self.countries: List[List[str]] = json.loads((root / "countries.json").read_text())
+        # normalized code and name → country id, for "Name, Country" queries
+        self._country_keys: Dict[str, set] = {}
+        for cid, (code, country_name) in enumerate(self.countries):
+            for k in (normalize_name(code), normalize_name(country_name)):
+                self._country_keys.setdefault(k, set()).add(cid)
+        self.n_keys = len(self.key_place)
+
+    @staticmethod
+    def _map_bytes(path: Path) -> mmap.mmap:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _int64_view(self, name: str) -> memoryview:
+        # plain-int view of an .npy's data for the binary-search hot loop;
+        # numpy scalar indexing costs ~1 µs per access, a memoryview ~50 ns
+        array = np.load(self.root / name, mmap_mode="r")
+        if array.dtype != np.int64:
+            raise ValueError(f"{name}: expected int64, got {array.dtype}")
+        mapped = self._map_bytes(self.root / name)
+        return memoryview(mapped)[array.offset:array.offset + array.nbytes].cast("q")
+
+    def _key(self, i: int) -> bytes:
+        return self._keys[self._key_offsets[i]:self._key_offsets[i + 1]]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def place(self, p: int) -> Dict[str, Any]:
+        name = self._names[int(self.name_offsets[p]):int(self.name_offsets[p + 1])].decode("utf-8")
+        return {
+            "name": name,
+            "country": self.countries[int(self.country[p])][1],
+            "lat": round(float(self.lat[p]), 4),
+            "lon": round(float(self.lon[p]), 4),
+            "population": int(self.population[p]),
+        }
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Exact (normalized) name match; the most populous place wins.
+        "Name, Country" restricts matches to that country.
+        """
+        name, _, country = query.rpartition(",") if "," in query else (query, "", "")
+        key = normalize_name(name).encode("utf-8")
+        if not key:
+            return None
+        country_ids = self._country_keys.get(normalize_name(country), set()) if country.strip() else None
+
+        i = self._lower_bound(key)
+        while i < self.n_keys and self._key(i) == key:
+            p = int(self.key_place[i])
+            if country_ids is None or int(self.country[p]) in country_ids:
+                geo = self.place(p)
+                del geo["population"]  # same shape as the other geocoders
+                return geo
+            i += 1
+        return None
+
+    def prefix_search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Places whose name starts with `prefix`, most populous first."""
+        key = normalize_name(prefix).encode("utf-8")
+        if not key:
+            return []
+        # keys sharing the prefix are one contiguous run; 0xFF never occurs in
+        # UTF-8, so prefix + 0xFF sorts after every key that starts with it
+        start = self._lower_bound(key)
+        stop = min(self._lower_bound(key + b"\xff"), start + PREFIX_SCAN_MAX)
+        if stop == start:
+            return []
+
+        places = np.unique(np.asarray(self.key_place[start:stop]))
+        top = places[np.argsort(-np.asarray(self.population[places]), kind="stable")[:limit]]
+        return [self.place(int(p)) for p in top]
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The shared gazetteer, or None when none has been built."""
+    global _gazetteer, _gazetteer_loaded
+    if not _gazetteer_loaded:
+        with _gazetteer_lock:
+            if not _gazetteer_loaded:
+                if (GAZETTEER_DIR / "meta.json").exists():
+                    try:
+                        _gazetteer = Gazetteer(GAZETTEER_DIR)
+                        print(f"📍 Gazetteer mapped ({_gazetteer.meta['places']} places).")
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"⚠ Gazetteer unreadable, using online geocoding: {e}")
+                _gazetteer_loaded = True
+    return _gazetteer
@@ -1,5 +1,12 @@
 ### FILE: core/geo.py
-import requests
+import os
+from typing import Dict, Any, List, Optional, Tuple
+from .upstream import async_get_json, http_get
+from .geocache import get_geocode_cache, normalize_place
+from .gazetteer import get_gazetteer
+from .weather_cache import get_weather_cache
+from .metrics import timed_stage, cache_event
+from .features import PAST_DAYS
 
 # 🔥 **Override Exact Known Locations**
 OVERRIDE_LOCATIONS = {
@@ -31,23 +38,19 @@ OVERRIDE_LOCATIONS = {
 }
 
 
-def geocode_place(place: str):
-    place = place.lower().strip()
+# overridable so benchmarks can point at local stand-ins
+GEOCODING_URL = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+# names the offline gazetteer does not know still go to Open-Meteo unless this is 0
+GAZETTEER_FALLBACK = os.getenv("GAZETTEER_FALLBACK", "1") == "1"
 
-    # override dictionary check
-    if place in OVERRIDE_LOCATIONS:
-        return OVERRIDE_LOCATIONS[place]
 
-    # fallback open-meteo geocoding
-    url = "https://geocoding-api.open-meteo.com/v1/search"
-    params = {"name": place, "count": 1, "language": "en", "format": "json"}
-    resp = requests.get(url, params=params, timeout=10)
+def _geocode_params(place: str):
+    return {"name": place, "count": 1, "language": "en", "format": "json"}
 
-    if resp.status_code != 200:
-        return None
 
-    data = resp.json()
-    if "results" not in data or len(data["results"]) == 0:
+def _parse_geocode(data):
+    if not data or "results" not in data or len(data["results"]) == 0:
         return None
 
     r = data["results"][0]
@@ -59,17 +62,134 @@ def geocode_place(place: str):
     }
 
 
-def fetch_weather(lat: float, lon: float):
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
+def _weather_params(lat: float, lon: float):
+    return {
         "latitude": lat,
         "longitude": lon,
         "current_weather": True,
         "hourly": "temperature_2m,relativehumidity_2m,precipitation,windgusts_10m",
+        "past_days": PAST_DAYS,  # history for the rolling rain windows
         "forecast_days": 1,
         "timezone": "auto"
     }
-    resp = requests.get(url, params=params, timeout=10)
+
+
+def _geocode_offline(place: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    (resolved, geo) from local sources only: overrides, the offline
+    gazetteer, then the geocode cache. resolved=False → ask Open-Meteo.
+    """
+    # override dictionary check
+    if place in OVERRIDE_LOCATIONS:
+        cache_event("geocode", "override")
+        return True, OVERRIDE_LOCATIONS[place]
+
+    # memory-mapped GeoNames index (binary search, no network)
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        geo = gazetteer.lookup(place)
+        if geo is not None:
+            cache_event("geocode", "gazetteer")
+            return True, geo
+
+    # LRU → SQLite cache (also remembers names that did not resolve)
+    hit, geo = get_geocode_cache().get(place)
+    if hit:
+        return True, geo
+
+    if gazetteer is not None and not GAZETTEER_FALLBACK:
+        return True, None
+    return False, None
+
+
+@timed_stage("geocode")
+def geocode_place(place: str):
+    place = normalize_place(place)
+
+    resolved, geo = _geocode_offline(place)
+    if resolved:
+        return geo
+
+    # fallback open-meteo geocoding
+    resp = http_get(GEOCODING_URL, params=_geocode_params(place))
+
+    if resp.status_code != 200:
+        return None
+
+    geo = _parse_geocode(resp.json())
+    get_geocode_cache().put(place, geo)
+    return geo
+
+
+def _fetch_weather_upstream(lat: float, lon: float):
+    resp = http_get(FORECAST_URL, params=_weather_params(lat, lon))
     if resp.status_code != 200:
         return None
     return resp.json()
+
+
+@timed_stage("weather")
+def fetch_weather(lat: float, lon: float):
+    # shared per grid cell until the next hourly model update
+    return get_weather_cache().get_or_fetch(lat, lon, _fetch_weather_upstream)
+
+
+# Open-Meteo accepts comma-separated coordinate lists and answers with a list
+WEATHER_MULTI_CHUNK = 50
+
+
+def fetch_weather_many(points: List[Tuple[float, float]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Forecasts for many (lat, lon) points with one upstream call per chunk.
+    Entries are None where a chunk failed. Bypasses the per-cell cache —
+    meant for grid jobs whose points are already on their own grid.
+    """
+    results: List[Optional[Dict[str, Any]]] = []
+    for start in range(0, len(points), WEATHER_MULTI_CHUNK):
+        chunk = points[start:start + WEATHER_MULTI_CHUNK]
+        params = _weather_params(
+            ",".join(f"{lat:.4f}" for lat, _ in chunk),
+            ",".join(f"{lon:.4f}" for _, lon in chunk),
+        )
+        try:
+            resp = http_get(FORECAST_URL, params=params)
+            data = resp.json() if resp.status_code == 200 else None
+        except Exception:
+            data = None
+
+        if isinstance(data, dict):
+            data = [data]  # single-point chunks come back unwrapped
+        if not isinstance(data, list) or len(data) != len(chunk):
+            results.extend([None] * len(chunk))
+        else:
+            results.extend(data)
+    return results
+
+
+# ---------------- ASYNC VARIANTS ----------------
+
+@timed_stage("geocode")
+async def geocode_place_async(place: str):
+    place = normalize_place(place)
+
+    resolved, geo = _geocode_offline(place)
+    if resolved:
+        return geo
+
+    data = await async_get_json(GEOCODING_URL, params=_geocode_params(place))
+    if data is None:
+        # upstream failure, not a verdict on the name → don't cache
+        return None
+
+    geo = _parse_geocode(data)
+    get_geocode_cache().put(place, geo)
+    return geo
+
+
+async def _fetch_weather_upstream_async(lat: float, lon: float):
+    return await async_get_json(FORECAST_URL, params=_weather_params(lat, lon))
+
+
+@timed_stage("weather")
+async def fetch_weather_async(lat: float, lon: float):
+    return await get_weather_cache().aget_or_fetch(lat, lon, _fetch_weather_upstream_async)
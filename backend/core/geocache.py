@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from .metrics import cache_event
+
+# ---------------- GEOCODING CACHE ----------------
+# Two tiers: a bounded in-process LRU in front of an on-disk SQLite table.
+# Place-name resolution is effectively static, so positive entries never
+# expire; names that did not resolve are cached for GEOCODE_NEGATIVE_TTL.
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "cache" / "geocode.sqlite3"
+GEOCODE_CACHE_PATH = Path(os.getenv("GEOCODE_CACHE_PATH", str(DEFAULT_CACHE_PATH)))
+GEOCODE_LRU_SIZE = int(os.getenv("GEOCODE_LRU_SIZE", "4096"))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", "86400"))
+
+def normalize_place(place: str) -> str:
+    return " ".join((place or "").lower().split())
+
+
+class GeocodeCache:
+    def __init__(self, path: Optional[Path], lru_size: int, negative_ttl: float):
+        self.lru_size = lru_size
+        self.negative_ttl = negative_ttl
+        # value is (geo dict or None, stored_at)
+        self._lru: "OrderedDict[str, Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT,"          # NULL = negative entry
+                " stored_at REAL NOT NULL)"
+            )
+            self._db = db
+        except (sqlite3.Error, OSError) as e:
+            # read-only or missing volume: keep serving from memory only
+            print(f"⚠ Geocode cache disk tier disabled: {e}")
+            self._db = None
+
+    def _fresh(self, value: Optional[Dict[str, Any]], stored_at: float) -> bool:
+        return value is not None or time.time() - stored_at < self.negative_ttl
+
+    def _remember(self, key: str, value: Optional[Dict[str, Any]], stored_at: float) -> None:
+        self._lru[key] = (value, stored_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, place: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Returns (hit, geo). A hit with geo=None is a cached negative:
+        the name is known not to resolve.
+        """
+        key = normalize_place(place)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and self._fresh(*entry):
+                self._lru.move_to_end(key)
+                cache_event("geocode", "hit_memory")
+                return True, entry[0]
+
+            row = None
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT payload, stored_at FROM geocode WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+            if row is None:
+                cache_event("geocode", "miss")
+                return False, None
+
+            value = json.loads(row[0]) if row[0] is not None else None
+            if not self._fresh(value, row[1]):
+                cache_event("geocode", "miss")
+                return False, None
+            self._remember(key, value, row[1])
+            cache_event("geocode", "hit_disk")
+            return True, value
+
+    def put(self, place: str, value: Optional[Dict[str, Any]]) -> None:
+        key = normalize_place(place)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, value, stored_at)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode (key, payload, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value) if value is not None else None, stored_at),
+                )
+            except sqlite3.Error:
+                pass
+
+    def positive_entries(self, limit: int = 100_000) -> List[Tuple[str, Dict[str, Any]]]:
+        """(key, geo) for names that resolved, most recently stored first."""
+        with self._lock:
+            entries = {k: v for k, (v, _) in self._lru.items() if v is not None}
+            if self._db is not None:
+                try:
+                    rows = self._db.execute(
+                        "SELECT key, payload FROM geocode WHERE payload IS NOT NULL"
+                        " ORDER BY stored_at DESC LIMIT ?", (limit,)
+                    ).fetchall()
+                except sqlite3.Error:
+                    rows = []
+                for key, payload in rows:
+                    entries.setdefault(key, json.loads(payload))
+        return list(entries.items())[:limit]
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+
+_cache: Optional[GeocodeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GeocodeCache(GEOCODE_CACHE_PATH, GEOCODE_LRU_SIZE, GEOCODE_NEGATIVE_TTL)
+    return _cache
@@ -1,10 +1,10 @@
-import requests
 from typing import Optional, Dict
+from .upstream import http_get
 
 def geocode_place(place: str) -> Optional[Dict]:
     url = "https://geocoding-api.open-meteo.com/v1/search"
     params = {"name": place, "count": 1, "format": "json"}
-    resp = requests.get(url, params=params, timeout=10)
+    resp = http_get(url, params=params)
 
     if resp.status_code != 200:
         return None
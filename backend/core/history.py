@@ -0,0 +1,252 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from .metrics import Counter, register
+
+# ---------------- RISK HISTORY ----------------
+# Every computed /risk result is appended to a local SQLite table so
+# dashboards can read trends without re-querying upstreams. Requests only
+# enqueue rows; a writer thread inserts them in batches (one transaction per
+# batch), so the request path never waits on disk.
+
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent.parent / "cache" / "history.sqlite3"
+HISTORY_DB_PATH = Path(os.getenv("HISTORY_DB_PATH", str(DEFAULT_HISTORY_PATH)))
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "1") == "1"
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", "1.0"))
+HISTORY_QUEUE_MAX = int(os.getenv("HISTORY_QUEUE_MAX", "100000"))
+HISTORY_QUERY_LIMIT = int(os.getenv("HISTORY_QUERY_LIMIT", "5000"))
+
+BUCKETS = {"hour": 3600, "day": 86400}
+
+HISTORY_ROWS = register(Counter(
+    "gdis_history_rows_total",
+    "Risk history rows by outcome (written, dropped)",
+))
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS risk_history ("
+    " ts REAL NOT NULL,"
+    " location_key TEXT NOT NULL,"   # rounded lat,lon of the resolved place
+    " name TEXT,"
+    " country TEXT,"
+    " lat REAL,"
+    " lon REAL,"
+    " flood_score REAL,"
+    " flood_level TEXT,"
+    " flood_method TEXT,"
+    " heat_score REAL,"
+    " storm_score REAL,"
+    " rain_last_1d REAL,"
+    " rain_last_7d REAL,"
+    " city_alert INTEGER,"
+    " country_alert INTEGER,"
+    " stale INTEGER,"
+    " model_version TEXT,"
+    " features TEXT,"                # JSON
+    " alert TEXT)"                   # JSON
+)
+_INDEX = "CREATE INDEX IF NOT EXISTS risk_history_loc_ts ON risk_history (location_key, ts)"
+_COLUMNS = (
+    "ts, location_key, name, country, lat, lon, flood_score, flood_level, flood_method,"
+    " heat_score, storm_score, rain_last_1d, rain_last_7d, city_alert, country_alert,"
+    " stale, model_version, features, alert"
+)
+
+
+def location_key(lat: float, lon: float) -> str:
+    return f"{lat:.4f},{lon:.4f}"
+
+
+def history_row(payload: Dict[str, Any], model_version: str, ts: Optional[float] = None) -> Tuple:
+    """Flatten a /risk payload (see `build_risk_payload`) into a table row."""
+    location = payload["location"]
+    risks = payload["risks"]
+    features = payload.get("features", {})
+    alert = payload.get("alert", {})
+    return (
+        ts if ts is not None else time.time(),
+        location_key(location["lat"], location["lon"]),
+        location.get("name"),
+        location.get("country"),
+        location["lat"],
+        location["lon"],
+        risks["flood"]["score"],
+        risks["flood"]["level"],
+        risks["flood"].get("method"),
+        risks["heat"]["score"],
+        risks["storm"]["score"],
+        features.get("rain_last_1d"),
+        features.get("rain_last_7d"),
+        int(bool(alert.get("city_alert"))),
+        int(bool(alert.get("country_alert"))),
+        int(bool(alert.get("stale"))),
+        model_version,
+        json.dumps(features),
+        json.dumps(alert),
+    )
+
+
+class HistoryStore:
+    def __init__(self, path: Path, batch_size: int, flush_seconds: float, queue_max: int):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Tuple]" = queue.Queue(maxsize=queue_max)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None  # read connection
+        self._read_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.path), check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(_SCHEMA)
+        db.execute(_INDEX)
+        db.commit()
+        return db
+
+    # ---------- writer ----------
+
+    def append(self, row: Tuple) -> None:
+        """Enqueue one row; never blocks. Rows are dropped if the writer falls behind."""
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            HISTORY_ROWS.inc(outcome="dropped")
+
+    def _drain(self, first: Tuple) -> List[Tuple]:
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, db: sqlite3.Connection, batch: List[Tuple]) -> None:
+        try:
+            with db:  # one transaction per batch
+                db.executemany(f"INSERT INTO risk_history ({_COLUMNS}) VALUES ({', '.join('?' * 19)})", batch)
+            HISTORY_ROWS.inc(len(batch), outcome="written")
+        except sqlite3.Error as e:
+            print(f"⚠ History write failed ({len(batch)} rows): {e}")
+            HISTORY_ROWS.inc(len(batch), outcome="dropped")
+
+    def _run(self) -> None:
+        try:
+            db = self._connect()
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠ Risk history disabled: {e}")
+            return
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            self._write(db, self._drain(first))
+        db.close()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="risk-history", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what is queued and stop the writer."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---------- queries ----------
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def series(
+        self,
+        key: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        bucket: Optional[str] = None,
+        limit: int = HISTORY_QUERY_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """Rows (or per-bucket aggregates) for one location, oldest first."""
+        start = 0.0 if start is None else start
+        end = time.time() if end is None else end
+        if bucket is None:
+            sql = (
+                "SELECT ts, flood_score, flood_level, heat_score, storm_score, rain_last_1d,"
+                " rain_last_7d, city_alert, country_alert, stale, model_version"
+                " FROM risk_history WHERE location_key = ? AND ts >= ? AND ts < ?"
+                " ORDER BY ts DESC LIMIT ?"
+            )
+            params: Tuple = (key, start, end, limit)
+        else:
+            sql = (
+                "SELECT CAST(ts / ? AS INTEGER) * ? AS bucket_ts, ROUND(AVG(flood_score), 3), MAX(flood_score),"
+                " ROUND(AVG(heat_score), 3), ROUND(AVG(storm_score), 3), MAX(rain_last_1d), MAX(rain_last_7d),"
+                " MAX(city_alert), MAX(country_alert), COUNT(*)"
+                " FROM risk_history WHERE location_key = ? AND ts >= ? AND ts < ?"
+                " GROUP BY bucket_ts ORDER BY bucket_ts DESC LIMIT ?"
+            )
+            width = BUCKETS[bucket]
+            params = (width, width, key, start, end, limit)
+
+        with self._read_lock:
+            rows = self._reader().execute(sql, params).fetchall()
+        rows.reverse()  # newest `limit` rows, returned oldest first
+
+        if bucket is None:
+            names = ("ts", "flood_score", "flood_level", "heat_score", "storm_score", "rain_last_1d",
+                     "rain_last_7d", "city_alert", "country_alert", "stale", "model_version")
+        else:
+            names = ("ts", "flood_score_avg", "flood_score_max", "heat_score_avg", "storm_score_avg",
+                     "rain_last_1d_max", "rain_last_7d_max", "city_alert", "country_alert", "samples")
+        return [dict(zip(names, row)) for row in rows]
+
+    def aggregate(self, key: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Range summary for one location."""
+        start = 0.0 if start is None else start
+        end = time.time() if end is None else end
+        sql = (
+            "SELECT COUNT(*), MIN(ts), MAX(ts), ROUND(AVG(flood_score), 3), MIN(flood_score), MAX(flood_score),"
+            " MAX(rain_last_1d), SUM(city_alert), SUM(country_alert), SUM(flood_level = 'High')"
+            " FROM risk_history WHERE location_key = ? AND ts >= ? AND ts < ?"
+        )
+        with self._read_lock:
+            row = self._reader().execute(sql, (key, start, end)).fetchone()
+        names = ("samples", "first_ts", "last_ts", "flood_score_avg", "flood_score_min", "flood_score_max",
+                 "rain_last_1d_max", "city_alert_samples", "country_alert_samples", "high_flood_samples")
+        return dict(zip(names, row))
+
+
+_history = HistoryStore(HISTORY_DB_PATH, HISTORY_BATCH_SIZE, HISTORY_FLUSH_SECONDS, HISTORY_QUEUE_MAX)
+
+
+def get_history() -> HistoryStore:
+    return _history
+
+
+def record_result(payload: Dict[str, Any], model_version: str) -> None:
+    """Append a computed /risk payload to the history (no-op when disabled)."""
+    if not HISTORY_ENABLED or "error" in payload:
+        return
+    try:
+        _history.append(history_row(payload, model_version))
+    except (KeyError, TypeError):
+        pass  # incomplete payload: nothing sensible to store
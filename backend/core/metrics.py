@@ -0,0 +1,190 @@
+"""
+In-process latency histograms and counters, rendered as Prometheus text.
+
+Recording is a perf_counter() pair, a bisect and a short lock — cheap enough
+to stay on in production. When a request opts in (`start_request_timings`),
+stage durations are also summed into a per-request dict via a ContextVar,
+which asyncio tasks spawned by the request inherit.
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# seconds; upstream timeouts sit around 10 s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                running = 0
+                for bound, c in zip(self.buckets, counts):
+                    running += c
+                    lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', f'{bound:g}'))} {running}")
+                running += counts[-1]
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {running}")
+                lines.append(f"{self.name}_sum{_fmt_labels(key)} {total[0]:.6f}")
+                lines.append(f"{self.name}_count{_fmt_labels(key)} {running}")
+        return lines
+
+
+# ---------------- REGISTRY ----------------
+
+STAGE_SECONDS = Histogram("gdis_stage_seconds", "Latency of /risk pipeline stages")
+UPSTREAM_SECONDS = Histogram("gdis_upstream_seconds", "Latency of upstream HTTP calls by host")
+UPSTREAM_REQUESTS = Counter("gdis_upstream_requests_total", "Upstream HTTP calls by host and outcome (ok, http_error, timeout, error)")
+CACHE_EVENTS = Counter("gdis_cache_events_total", "Cache lookups by cache and result (hit, miss, ...)")
+
+_REGISTRY: List = [STAGE_SECONDS, UPSTREAM_SECONDS, UPSTREAM_REQUESTS, CACHE_EVENTS]
+
+
+def register(metric):
+    _REGISTRY.append(metric)
+    return metric
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def cache_event(cache: str, result: str) -> None:
+    CACHE_EVENTS.inc(cache=cache, result=result)
+
+
+# ---------------- PER-REQUEST TIMINGS ----------------
+
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def merge_request_timings(stages: Dict[str, float]) -> None:
+    """Add stage timings (ms) measured elsewhere, e.g. by a shared call, to this request's."""
+    timings = _request_timings.get()
+    if timings is not None:
+        for stage, ms in stages.items():
+            timings[stage] = round(timings.get(stage, 0.0) + ms, 3)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = round(timings.get(stage, 0.0) + seconds * 1000.0, 3)  # ms
+
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timed_stage(stage: str):
+    """Decorator form of `timed`, for sync and async functions."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    record_stage(stage, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def observe_upstream(host: str, seconds: float, outcome: str) -> None:
+    UPSTREAM_SECONDS.observe(seconds, host=host)
+    UPSTREAM_REQUESTS.inc(host=host, outcome=outcome)
+    timings = _request_timings.get()
+    if timings is not None:
+        key = f"upstream:{host}"
+        timings[key] = round(timings.get(key, 0.0) + seconds * 1000.0, 3)
@@ -0,0 +1,122 @@
+"""
+Flood model artefact I/O.
+
+Preferred layout (xgboost native, no pickle):
+    ml/flood_xgb.json   manifest  {"model": "flood_xgb.ubj", "features": [...]}
+    ml/flood_xgb.ubj    booster in UBJSON
+Legacy layout, still readable:
+    ml/flood_xgb.joblib {"model": XGBClassifier | Booster, "features": [...]}
+
+    python -m core.model_store convert ml/flood_xgb.joblib
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ML_DIR = Path(__file__).resolve().parent.parent / "ml"
+MANIFEST_NAME = "flood_xgb.json"
+NATIVE_MODEL_NAME = "flood_xgb.ubj"
+LEGACY_NAME = "flood_xgb.joblib"
+FOREST_NAME = "flood_xgb.forest.npz"
+
+# process umask, read once: os.umask can only be read by setting it, which
+# is not safe while other threads create files
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def atomic_write(path: Path, write) -> None:
+    """Call `write(tmp_path)` then rename over `path`, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=path.suffix, dir=str(path.parent))
+    os.close(fd)
+    try:
+        write(Path(tmp))
+        # mkstemp creates 0600; give the file the mode open() would have,
+        # so a server running as another user can read what offline jobs write
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def save_native(booster, features: List[str], ml_dir: Path = ML_DIR, extra: Optional[Dict[str, Any]] = None) -> Path:
+    """Save booster (UBJSON) + manifest atomically; the manifest is written last."""
+    if hasattr(booster, "get_booster"):
+        booster = booster.get_booster()
+    ml_dir = Path(ml_dir)
+
+    atomic_write(ml_dir / NATIVE_MODEL_NAME, lambda tmp: booster.save_model(str(tmp)))
+
+    manifest = {"model": NATIVE_MODEL_NAME, "features": list(features)}
+    manifest.update(extra or {})
+    atomic_write(
+        ml_dir / MANIFEST_NAME,
+        lambda tmp: tmp.write_text(json.dumps(manifest, indent=2)),
+    )
+    return ml_dir / MANIFEST_NAME
+
+
+def artefact_version(path: Path) -> str:
+    """Short content hash of a model file, e.g. "flood_xgb.ubj@3f2a9c1d07"."""
+    path = Path(path)
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"{path.name}@{digest.hexdigest()[:10]}"
+
+
+def load_booster(ml_dir: Path = ML_DIR) -> Optional[Tuple[Any, List[str], str]]:
+    """
+    (booster, feature_names, model_path) from the native layout if present,
+    else the legacy joblib pickle; None when no artefact exists.
+    """
+    ml_dir = Path(ml_dir)
+    manifest_path = ml_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        import xgboost as xgb
+
+        manifest = json.loads(manifest_path.read_text())
+        booster = xgb.Booster()
+        booster.load_model(str(ml_dir / manifest["model"]))
+        booster.feature_names = manifest["features"]
+        return booster, manifest["features"], str(ml_dir / manifest["model"])
+
+    legacy_path = ml_dir / LEGACY_NAME
+    if legacy_path.exists():
+        import joblib
+
+        try:
+            artefact = joblib.load(legacy_path)
+        except Exception as e:
+            print(f"⚠ Could not read {legacy_path.name}: {e}")
+            return None
+        model = artefact["model"]
+        # XGBClassifier.predict returns labels; the raw booster returns probabilities
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        return booster, artefact["features"], str(legacy_path)
+
+    return None
+
+
+def _main(argv: List[str]) -> int:
+    if len(argv) != 2 or argv[0] != "convert":
+        print("usage: python -m core.model_store convert <artefact.joblib>")
+        return 2
+    import joblib
+
+    artefact = joblib.load(argv[1])
+    out = save_native(artefact["model"], artefact["features"], Path(argv[1]).resolve().parent)
+    print(f"✅ Native artefact written → {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import time
+from typing import Dict, Any, Optional, AsyncIterator, Iterable, Union
+from .geo import geocode_place_async, fetch_weather_async
+from .alerts import get_flood_event_signal_async, gdacs_only_flood_event_signal
+from .risk_engine import compute_risks_async, model_version
+from .history import record_result
+from .geocache import normalize_place
+from .singleflight import single_flight
+from .points import get_location_index, get_point_results, resolve_point
+from .satellite import get_satellite_flood_indicator
+
+# One budget for the whole request: geocode, then weather + alerts in parallel
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "12"))
+# locations in flight at once for streaming sweeps
+STREAM_CONCURRENCY = int(os.getenv("STREAM_CONCURRENCY", "16"))
+
+
+def build_risk_payload(geo: Dict[str, Any], weather: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "risks": result["risks"],
+        "alert": result["alert"],
+        "features": result["features"],
+        "ai_insight": result["ai_insight"],
+        "location": geo,
+        "weather": {
+            "temp_c": weather["current_weather"].get("temperature"),
+            "wind_kmh": weather["current_weather"].get("windspeed"),
+            "recent_rain_mm": result["features"]["rain_last_1d"],
+            "last_update": weather["current_weather"].get("time"),
+        },
+        # memory-mapped raster lookup, microseconds; "Unknown" where no layer covers the point
+        "satellite": get_satellite_flood_indicator(geo["lat"], geo["lon"]),
+    }
+
+
+# concurrent /risk requests for the same place share one pipeline run
+@single_flight("risk", key=lambda place, deadline=None: normalize_place(place))
+async def run_risk_pipeline(place: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Async /risk pipeline. Returns the response payload, or {"error": ...}.
+    Weather is required; alerts degrade to the cached GDACS-only signal
+    if ReliefWeb has not answered when the deadline runs out.
+    """
+    expires_at = time.monotonic() + (REQUEST_DEADLINE_SECONDS if deadline is None else deadline)
+
+    try:
+        geo = await asyncio.wait_for(geocode_place_async(place), max(0.0, expires_at - time.monotonic()))
+    except asyncio.TimeoutError:
+        return {"error": "Geocoding timed out"}
+    if geo is None:
+        return {"error": "Location not found"}
+
+    payload = await _score_location(geo, expires_at)
+    if "error" not in payload:
+        get_location_index().add(geo)  # later /risk/point queries nearby snap to it
+    return payload
+
+
+async def _score_location(geo: Dict[str, Any], expires_at: float) -> Dict[str, Any]:
+    """Weather ‖ alerts for a resolved location, then the risk payload."""
+    def remaining() -> float:
+        return max(0.0, expires_at - time.monotonic())
+
+    # country_name is deliberately not passed, matching the sync path
+    weather_task = asyncio.ensure_future(fetch_weather_async(geo["lat"], geo["lon"]))
+    alert_task = asyncio.ensure_future(
+        get_flood_event_signal_async(geo["name"], "", geo["lat"], geo["lon"])
+    )
+
+    await asyncio.wait({weather_task, alert_task}, timeout=remaining())
+
+    if not weather_task.done():
+        weather_task.cancel()
+        alert_task.cancel()
+        return {"error": "Weather service timed out"}
+    weather = weather_task.result()
+    if weather is None:
+        alert_task.cancel()
+        return {"error": "Weather service unavailable"}
+
+    if alert_task.done() and not alert_task.cancelled() and alert_task.exception() is None:
+        alert = alert_task.result()
+    else:
+        alert_task.cancel()
+        alert = gdacs_only_flood_event_signal(geo["name"], "", geo["lat"], geo["lon"])
+
+    weather["location_name"] = geo["name"]
+    result = await compute_risks_async(weather, alert=alert)
+
+    payload = build_risk_payload(geo, weather, result)
+    record_result(payload, model_version())
+    return payload
+
+
+# ---------------- COORDINATE QUERIES ----------------
+
+# points that resolve to the same place / weather cell share one run
+@single_flight("risk_point", key=lambda anchor, deadline=None: anchor["key"])
+async def _run_anchor_pipeline(anchor: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+    results = get_point_results()
+    payload = results.get(anchor["key"])
+    if payload is not None:
+        return payload
+    expires_at = time.monotonic() + (REQUEST_DEADLINE_SECONDS if deadline is None else deadline)
+    payload = await _score_location(anchor["geo"], expires_at)
+    if "error" not in payload:
+        results.put(anchor["key"], payload)
+    return payload
+
+
+async def run_point_pipeline(lat: float, lon: float, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    /risk/point: no forward geocoding. The point is snapped to a nearby
+    known place or scored at its own coordinates (see core.points); the
+    `point` block says which.
+    """
+    anchor = resolve_point(lat, lon)
+    payload = await _run_anchor_pipeline(anchor, deadline)
+    if "error" not in payload:
+        payload["point"] = {
+            "lat": lat,
+            "lon": lon,
+            "snapped": anchor["snapped"],
+            "nearest_km": anchor["nearest_km"],
+        }
+    return payload
+
+
+# ---------------- STREAMING SWEEPS ----------------
+
+async def _indexed_result(index: int, place: str) -> Dict[str, Any]:
+    try:
+        payload = await run_risk_pipeline(place)
+    except Exception as e:
+        payload = {"error": f"Pipeline failure: {e.__class__.__name__}"}
+    return {"index": index, "query": place, **payload}
+
+
+async def _aiter(places: Union[Iterable[str], AsyncIterator[str]]) -> AsyncIterator[str]:
+    if hasattr(places, "__aiter__"):
+        async for place in places:
+            yield place
+    else:
+        for place in places:
+            yield place
+
+
+async def stream_risk_pipeline(
+    places: Union[Iterable[str], AsyncIterator[str]],
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield one result per place as soon as it is ready (completion order,
+    tagged with the input `index`). At most `concurrency` pipelines run at
+    once and input is consumed lazily, so memory stays flat for long lists.
+    """
+    limit = max(1, concurrency or STREAM_CONCURRENCY)
+    pending = set()
+    try:
+        index = 0
+        async for place in _aiter(places):
+            place = (place or "").strip()
+            if not place:
+                continue
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(_indexed_result(index, place)))
+            index += 1
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # client went away mid-stream → don't leave orphaned upstream calls
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,238 @@
+"""
+Coordinate queries: reverse lookup and result reuse for /risk/point.
+
+Known places (OVERRIDE_LOCATIONS, positive geocode-cache entries, places
+resolved since start, and gazetteer places above REVERSE_MIN_POPULATION)
+are held as unit vectors in KD-trees (scipy cKDTree), so the nearest named
+place to a point is a log-time query. Chord length on the unit sphere is
+monotonic in great-circle distance, so the tree's Euclidean metric ranks
+neighbours exactly.
+
+A point within POINT_SNAP_RADIUS_KM of a known place is scored *as* that
+place (same weather cell, same cached result); anything else is scored at
+its own coordinates, named after the nearest place within REVERSE_MAX_KM,
+and its result is shared with other points in the same weather grid cell.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .event_index import EARTH_RADIUS_KM
+from .gazetteer import get_gazetteer
+from .geo import OVERRIDE_LOCATIONS
+from .geocache import get_geocode_cache, normalize_place
+from .metrics import cache_event
+from .weather_cache import cell_for, next_update_at
+
+# points this close to a known place reuse that place's weather and result
+POINT_SNAP_RADIUS_KM = float(os.getenv("POINT_SNAP_RADIUS_KM", "5"))
+# nearest place used to name a point for alert matching, up to this far away
+REVERSE_MAX_KM = float(os.getenv("REVERSE_MAX_KM", "50"))
+# gazetteer places indexed for reverse lookup (0 = all)
+REVERSE_MIN_POPULATION = int(os.getenv("REVERSE_MIN_POPULATION", "1000"))
+# places learned since the last rebuild are scanned linearly until this many
+POINT_INDEX_REBUILD = int(os.getenv("POINT_INDEX_REBUILD", "256"))
+POINT_RESULT_CACHE_SIZE = int(os.getenv("POINT_RESULT_CACHE_SIZE", "20000"))
+# cap on result reuse; results also expire at the next hourly weather update
+POINT_RESULT_TTL_SECONDS = float(os.getenv("POINT_RESULT_TTL_SECONDS", "600"))
+
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_for_km(km: float) -> float:
+    return 2.0 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def km_for_chord(chord: float) -> float:
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(chord / 2.0, 1.0))
+
+
+def _geo(geo: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": geo["name"], "country": geo.get("country"), "lat": geo["lat"], "lon": geo["lon"]}
+
+
+class LocationIndex:
+    """Nearest known place to a coordinate."""
+
+    def __init__(self):
+        self._local: List[Dict[str, Any]] = []          # tree rows → geo
+        self._local_tree: Optional[cKDTree] = None
+        self._pending: List[Dict[str, Any]] = []        # learned, not yet in the tree
+        self._seen: set = set()
+        self._gazetteer_rows: Optional[np.ndarray] = None
+        self._gazetteer_tree: Optional[cKDTree] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ---------- build ----------
+
+    def _remember(self, geo: Dict[str, Any]) -> bool:
+        if not geo or geo.get("lat") is None or geo.get("lon") is None or not geo.get("name"):
+            return False
+        key = (round(float(geo["lat"]), 4), round(float(geo["lon"]), 4))
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def _rebuild_local(self) -> None:
+        self._local.extend(self._pending)
+        self._pending = []
+        if self._local:
+            self._local_tree = cKDTree(unit_vectors(
+                [g["lat"] for g in self._local], [g["lon"] for g in self._local]
+            ))
+
+    def warm(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            start = time.time()
+            for geo in list(OVERRIDE_LOCATIONS.values()) + [g for _, g in get_geocode_cache().positive_entries()]:
+                if self._remember(geo):
+                    self._pending.append(_geo(geo))
+            self._rebuild_local()
+
+            gazetteer = get_gazetteer()
+            if gazetteer is not None:
+                rows = np.flatnonzero(np.asarray(gazetteer.population) >= REVERSE_MIN_POPULATION)
+                if len(rows):
+                    self._gazetteer_rows = rows
+                    self._gazetteer_tree = cKDTree(unit_vectors(gazetteer.lat[rows], gazetteer.lon[rows]))
+            n_gazetteer = 0 if self._gazetteer_rows is None else len(self._gazetteer_rows)
+            print(f"🧭 Point index: {len(self._local)} known + {n_gazetteer} gazetteer places "
+                  f"({time.time() - start:.2f}s).")
+            self._loaded = True
+
+    def add(self, geo: Dict[str, Any]) -> None:
+        """A place resolved by name; make it available for reverse lookup."""
+        self.warm()
+        with self._lock:
+            if not self._remember(geo):
+                return
+            self._pending.append(_geo(geo))
+            if len(self._pending) >= POINT_INDEX_REBUILD:
+                self._rebuild_local()
+
+    # ---------- query ----------
+
+    def nearest(self, lat: float, lon: float, max_km: float = REVERSE_MAX_KM) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(geo, distance_km) of the closest known place within `max_km`, else None."""
+        self.warm()
+        point = unit_vectors([lat], [lon])[0]
+        bound = chord_for_km(max_km)
+        best: Optional[Tuple[Dict[str, Any], float]] = None
+
+        with self._lock:
+            local_tree, local, pending = self._local_tree, self._local, list(self._pending)
+        if local_tree is not None:
+            chord, row = local_tree.query(point, distance_upper_bound=bound)
+            if row < len(local):
+                best = local[row], chord
+        if pending:
+            chords = np.linalg.norm(
+                unit_vectors([g["lat"] for g in pending], [g["lon"] for g in pending]) - point, axis=1
+            )
+            i = int(np.argmin(chords))
+            if chords[i] <= bound and (best is None or chords[i] < best[1]):
+                best = pending[i], float(chords[i])
+        if self._gazetteer_tree is not None:
+            chord, row = self._gazetteer_tree.query(point, distance_upper_bound=bound)
+            # known places win ties: they are what users actually query
+            if row < len(self._gazetteer_rows) and (best is None or chord < best[1]):
+                place = get_gazetteer().place(int(self._gazetteer_rows[row]))
+                del place["population"]
+                best = place, chord
+
+        if best is None:
+            return None
+        return best[0], km_for_chord(float(best[1]))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "known": len(self._local) + len(self._pending),
+            "gazetteer": 0 if self._gazetteer_rows is None else len(self._gazetteer_rows),
+        }
+
+
+def resolve_point(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Where and as what a point is scored:
+    {"key", "geo", "snapped", "nearest_km"}. `key` is shared by every point
+    that may reuse the same result.
+    """
+    near = get_location_index().nearest(lat, lon)
+    if near is not None and near[1] <= POINT_SNAP_RADIUS_KM:
+        geo, km = near
+        return {
+            "key": f"place:{normalize_place(geo['name'])}|{geo['lat']:.4f},{geo['lon']:.4f}",
+            "geo": dict(geo),
+            "snapped": True,
+            "nearest_km": round(km, 2),
+        }
+
+    cell = cell_for(lat, lon)
+    if near is not None:
+        name, country, km = near[0]["name"], near[0].get("country"), round(near[1], 2)
+    else:
+        name, country, km = f"{lat:.3f}, {lon:.3f}", "", None
+    return {
+        "key": f"cell:{cell[0]},{cell[1]}",
+        "geo": {"name": name, "country": country, "lat": round(lat, 4), "lon": round(lon, 4)},
+        "snapped": False,
+        "nearest_km": km,
+    }
+
+
+class PointResultCache:
+    """Recent point payloads by `resolve_point` key."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() >= entry[1]:
+                self._entries.pop(key, None)
+                cache_event("point_result", "miss")
+                return None
+            self._entries.move_to_end(key)
+        cache_event("point_result", "hit_memory")
+        return dict(entry[0])
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        expires_at = min(time.time() + self.ttl, next_update_at())
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_index = LocationIndex()
+_results = PointResultCache(POINT_RESULT_CACHE_SIZE, POINT_RESULT_TTL_SECONDS)
+
+
+def get_location_index() -> LocationIndex:
+    return _index
+
+
+def get_point_results() -> PointResultCache:
+    return _results
@@ -0,0 +1,139 @@
+"""
+Memory-mapped gridded layers (precipitation, surface water, ...).
+
+Each layer is a 2-D float32 `.npy` grid plus a `.json` sidecar, written by
+the offline `ingest_rasters.py` step:
+
+    rasters/precip_24h.npy    (rows north → south, cols west → east)
+    rasters/precip_24h.json   {"west", "north", "cellsize", "nodata", "units", ...}
+
+Serving opens the grid with mmap_mode="r": a point lookup is an index
+computation plus a single cell read, and only the touched pages are ever
+read from disk (or the page cache).
+
+Ingestion replaces both files with os.replace, sidecar last. An open memmap
+keeps reading the old inode, so the store re-stats each layer's sidecar
+every RASTER_RECHECK_SECONDS and reopens the layer when it changed (or
+first appeared).
+"""
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RASTER_DIR = Path(__file__).resolve().parent.parent / "rasters"
+RASTER_DIR = Path(os.getenv("RASTER_DIR", str(DEFAULT_RASTER_DIR)))
+# how often a served layer checks for a newer ingest (one stat per layer)
+RASTER_RECHECK_SECONDS = float(os.getenv("RASTER_RECHECK_SECONDS", "30"))
+
+
+class RasterLayer:
+    def __init__(self, grid: np.ndarray, meta: Dict[str, Any]):
+        self.grid = grid
+        self.meta = meta
+        self.west = float(meta["west"])
+        self.north = float(meta["north"])
+        self.cellsize = float(meta["cellsize"])
+        self.nodata = meta.get("nodata")
+        self.rows, self.cols = grid.shape
+
+    @classmethod
+    def open(cls, npy_path: Path) -> "RasterLayer":
+        meta = json.loads(npy_path.with_suffix(".json").read_text())
+        return cls(np.load(npy_path, mmap_mode="r"), meta)
+
+    def _index(self, lat: np.ndarray, lon: np.ndarray):
+        # longitudes wrap, latitudes do not
+        lon = (lon - self.west) % 360.0
+        row = np.floor((self.north - lat) / self.cellsize).astype(np.int64)
+        col = np.floor(lon / self.cellsize).astype(np.int64)
+        inside = (row >= 0) & (row < self.rows) & (col >= 0) & (col < self.cols)
+        return row, col, inside
+
+    def lookup(self, lat: float, lon: float) -> Optional[float]:
+        """Cell value at a point; None outside the grid or on nodata."""
+        row = math.floor((self.north - lat) / self.cellsize)
+        col = math.floor(((lon - self.west) % 360.0) / self.cellsize)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        value = float(self.grid[row, col])
+        if math.isnan(value) or value == self.nodata:
+            return None
+        return value
+
+    def lookup_many(self, lats, lons) -> np.ndarray:
+        """Vectorised lookup; NaN outside the grid or on nodata."""
+        lat = np.asarray(lats, dtype=float)
+        lon = np.asarray(lons, dtype=float)
+        row, col, inside = self._index(lat, lon)
+        out = np.full(lat.shape, np.nan)
+        if inside.any():
+            # fancy indexing on a memmap reads only the addressed cells
+            values = np.asarray(self.grid[row[inside], col[inside]], dtype=float)
+            if self.nodata is not None:
+                values[values == self.nodata] = np.nan
+            out[inside] = values
+        return out
+
+
+class RasterStore:
+    """Opens layers on first use and reopens them after a new ingest; missing layers are None."""
+
+    def __init__(self, root: Path, recheck: float = RASTER_RECHECK_SECONDS):
+        self.root = root
+        self.recheck = recheck
+        # name → (layer, sidecar mtime_ns, monotonic time of the last check)
+        self._layers: Dict[str, Tuple[Optional[RasterLayer], Optional[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def _sidecar_mtime(self, name: str) -> Optional[int]:
+        try:
+            return (self.root / f"{name}.json").stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _open(self, name: str) -> Optional[RasterLayer]:
+        path = self.root / f"{name}.npy"
+        try:
+            return RasterLayer.open(path) if path.exists() else None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠ Raster layer {name} unreadable: {e}")
+            return None
+
+    def layer(self, name: str) -> Optional[RasterLayer]:
+        now = time.monotonic()
+        entry = self._layers.get(name)
+        if entry is not None and now - entry[2] < self.recheck:
+            return entry[0]
+        with self._lock:
+            entry = self._layers.get(name)
+            if entry is not None and now - entry[2] < self.recheck:
+                return entry[0]
+            mtime = self._sidecar_mtime(name)
+            if entry is not None and entry[1] == mtime:
+                self._layers[name] = (entry[0], mtime, now)
+                return entry[0]
+            # sidecar is written last, so a changed sidecar means a complete ingest
+            layer = self._open(name) if mtime is not None else None
+            if entry is not None and layer is not None:
+                action = "reloaded" if entry[0] is not None else "loaded"
+                print(f"🛰 Raster layer {name} {action} ({layer.meta.get('ingested_at', 'new ingest')}).")
+            self._layers[name] = (layer, mtime, now)
+            return layer
+
+    def reload(self) -> None:
+        """Drop open layers now, instead of waiting for the next recheck."""
+        with self._lock:
+            self._layers.clear()
+
+
+_store = RasterStore(RASTER_DIR)
+
+
+def get_raster_store() -> RasterStore:
+    return _store
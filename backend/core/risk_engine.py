@@ -1,71 +1,167 @@
+import asyncio
+import os
+import threading
 from pathlib import Path
-import joblib
 import numpy as np
-import xgboost as xgb
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .alerts import get_flood_event_signal   # <-- FIXED
+from .tree_eval import CompiledForest
+from .model_store import FOREST_NAME, artefact_version, load_booster
+from .metrics import timed, timed_stage
+from .batcher import INFERENCE_BATCHING, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS, MicroBatcher
+from .features import extract_features, feature_dicts, feature_matrix
+
+# ML Model — loaded lazily on first prediction, or eagerly from the app's
+# startup hook (FLOOD_MODEL_PRELOAD), so importing this module stays cheap.
+ML_DIR = Path(__file__).resolve().parent.parent / "ml"
+FOREST_PATH = ML_DIR / FOREST_NAME
+# "numpy" serves the exported forest (no xgboost needed); "xgboost" the booster
+INFERENCE_ENGINE = os.getenv("FLOOD_INFERENCE_ENGINE", "xgboost").lower()
+MODEL_PRELOAD = os.getenv("FLOOD_MODEL_PRELOAD", "1") == "1"
 
-# Load ML Model
-ML_PATH = Path(__file__).resolve().parent.parent / "ml" / "flood_xgb.joblib"
 _model = None
+_forest: Optional[CompiledForest] = None
 _feature_names = None
+_model_version = "fallback-rule"
+_model_loaded = False
+_model_lock = threading.Lock()
 
-if ML_PATH.exists():
-    artefact = joblib.load(ML_PATH)
-    _model = artefact["model"]
-    _feature_names = artefact["features"]
-    print("🚀 Flood XGBoost Model Loaded Successfully.")
-else:
-    print("⚠ ML Model NOT FOUND — Using fallback rule")
 
-def compute_flood_risk_ml(features: Dict[str, float]) -> Dict[str, Any]:
-    if _model is None:
-        return {"score": 0.2, "level": "Low", "method": "fallback-rule"}
+def load_model() -> None:
+    """Load the flood model once; safe to call from any thread."""
+    global _model, _forest, _feature_names, _model_version, _model_loaded
+    if _model_loaded:
+        return
+    with _model_lock:
+        if _model_loaded:
+            return
+
+        if INFERENCE_ENGINE == "numpy" and FOREST_PATH.exists():
+            _forest = CompiledForest.load(FOREST_PATH)
+            _feature_names = _forest.feature_names
+            _model_version = artefact_version(FOREST_PATH)
+            print(f"🚀 Flood model loaded as compiled NumPy forest ({_forest.n_trees} trees).")
+        else:
+            loaded = load_booster(ML_DIR)
+            if loaded is not None:
+                _model, _feature_names, source = loaded
+                _model_version = artefact_version(Path(source))
+                print(f"🚀 Flood XGBoost Model Loaded Successfully ({Path(source).name}).")
+            else:
+                print("⚠ ML Model NOT FOUND — Using fallback rule")
+
+        _model_loaded = True
+
+
+def model_version() -> str:
+    """Identifies the serving model (file name + content hash) in stored results."""
+    load_model()
+    return _model_version
 
-    X = np.array([features[f] for f in _feature_names]).reshape(1, -1)
-    dmatrix = xgb.DMatrix(X, feature_names=_feature_names)
-    prob = float(_model.predict(dmatrix)[0])
 
+def _flood_level(prob: float) -> str:
     if prob >= 0.75:
-        level = "High"
-    elif prob >= 0.40:
-        level = "Medium"
-    else:
-        level = "Low"
+        return "High"
+    if prob >= 0.40:
+        return "Medium"
+    return "Low"
 
-    return {"score": round(prob, 3), "level": level, "method": "ML-XGBoost"}
 
-def compute_risks(weather_data: Dict[str, Any]) -> Dict[str, Any]:
-    current = weather_data.get("current_weather", {})
-    hourly = weather_data.get("hourly", {})
+def _predict_proba(X: np.ndarray) -> np.ndarray:
+    if _forest is not None:
+        return _forest.predict(X)
+    import xgboost as xgb  # already imported by load_booster; cheap lookup
+    return _model.predict(xgb.DMatrix(X, feature_names=_feature_names))
 
-    temp = current.get("temperature")
-    wind = current.get("windspeed", 0.0)
-    precip_list = hourly.get("precipitation", [])
-
-    recent_rain_1d = max(precip_list[-1:], default=0.0)
-    recent_rain_3d = sum(precip_list[-3:]) if len(precip_list) >= 3 else recent_rain_1d
-    recent_rain_7d = sum(precip_list[-7:]) if len(precip_list) >= 7 else recent_rain_3d
-
-    humidity_series = hourly.get("relativehumidity_2m", [60])
-    humidity = humidity_series[-1] if humidity_series else 60
-
-    features = {
-        "rain_last_1d": recent_rain_1d,
-        "rain_last_3d": recent_rain_3d,
-        "rain_last_7d": recent_rain_7d,
-        "humidity": humidity,
-        "wind_speed": wind,
-        "elevation": 150
-    }
 
-    flood_ai = compute_flood_risk_ml(features)
+def _score(probs: np.ndarray) -> List[Dict[str, Any]]:
+    return [
+        {"score": round(float(p), 3), "level": _flood_level(float(p)), "method": "ML-XGBoost"}
+        for p in probs
+    ]
 
-    # 7 DAY + LIVE ALERTS
-    alert = get_flood_event_signal(
-        weather_data.get("location_name", ""),
-        weather_data.get("country_name", "")
+
+def _fallback(n: int) -> List[Dict[str, Any]]:
+    return [{"score": 0.2, "level": "Low", "method": "fallback-rule"} for _ in range(n)]
+
+
+@timed_stage("flood_model")
+def compute_flood_risk_ml_matrix(names: List[str], matrix: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Score a precomputed feature matrix (columns named by `names`, e.g. from
+    `features.feature_matrix`) with one predict call; the model's own
+    feature columns are picked out by name.
+    """
+    if len(matrix) == 0:
+        return []
+    load_model()
+    if _model is None and _forest is None:
+        return _fallback(len(matrix))
+
+    columns = [names.index(f) for f in _feature_names]
+    X = np.ascontiguousarray(matrix[:, columns], dtype=np.float32)
+    return _score(_predict_proba(X))
+
+
+@timed_stage("flood_model")
+def compute_flood_risk_ml_batch(feature_rows: List[Dict[str, float]]) -> List[Dict[str, Any]]:
+    """
+    Score many feature dicts with a single predict call over the stacked
+    feature matrix. Output order matches `feature_rows`.
+    """
+    if not feature_rows:
+        return []
+    load_model()
+    if _model is None and _forest is None:
+        return _fallback(len(feature_rows))
+
+    X = np.array(
+        [[row[f] for f in _feature_names] for row in feature_rows],
+        dtype=np.float32,
     )
+    return _score(_predict_proba(X))
+
+
+def compute_flood_risk_ml(features: Dict[str, float]) -> Dict[str, Any]:
+    return compute_flood_risk_ml_batch([features])[0]
+
+
+# concurrent async callers share one predict per batch (see core/batcher.py)
+_dispatcher = MicroBatcher(
+    "flood_model",
+    lambda X: _score(_predict_proba(X)),
+    INFERENCE_MAX_BATCH,
+    INFERENCE_MAX_WAIT_MS / 1000.0,
+)
+
+
+def get_inference_dispatcher() -> MicroBatcher:
+    return _dispatcher
+
+
+async def compute_flood_risk_ml_async(features: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Same result as `compute_flood_risk_ml`, but the row goes through the
+    micro-batching dispatcher so concurrent requests share one predict.
+    """
+    load_model()
+    if not INFERENCE_BATCHING or (_model is None and _forest is None):
+        return compute_flood_risk_ml(features)
+
+    row = np.array([[features[f] for f in _feature_names]], dtype=np.float32)
+    with timed("flood_model"):  # includes the queue wait
+        return await asyncio.wrap_future(_dispatcher.submit(row))
+
+
+def _assemble_risks(
+    weather_data: Dict[str, Any],
+    features: Dict[str, float],
+    flood_ai: Dict[str, Any],
+    alert: Dict[str, Any],
+) -> Dict[str, Any]:
+    current = weather_data.get("current_weather", {})
+    temp = current.get("temperature")
+    wind = current.get("windspeed", 0.0)
 
     # Fusion Logic
     if alert["city_alert"]:
@@ -110,3 +206,55 @@ def compute_risks(weather_data: Dict[str, Any]) -> Dict[str, Any]:
             f"— Sources: {', '.join(alert['sources_used'])}"
         )
     }
+
+
+def get_alert_signal(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    # 7 DAY + LIVE ALERTS
+    return get_flood_event_signal(
+        weather_data.get("location_name", ""),
+        weather_data.get("country_name", ""),
+        weather_data.get("latitude"),
+        weather_data.get("longitude"),
+    )
+
+
+@timed_stage("compute_risks")
+def compute_risks(weather_data: Dict[str, Any], alert: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    features = extract_features(weather_data)
+    flood_ai = compute_flood_risk_ml(features)
+    if alert is None:
+        alert = get_alert_signal(weather_data)
+
+    return _assemble_risks(weather_data, features, flood_ai, alert)
+
+
+@timed_stage("compute_risks")
+async def compute_risks_async(weather_data: Dict[str, Any], alert: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """`compute_risks` for the async pipeline, scored via the inference dispatcher."""
+    features = extract_features(weather_data)
+    flood_ai = await compute_flood_risk_ml_async(features)
+    if alert is None:
+        alert = get_alert_signal(weather_data)
+
+    return _assemble_risks(weather_data, features, flood_ai, alert)
+
+
+def compute_risks_batch(
+    weather_list: List[Dict[str, Any]],
+    alerts: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Same output as `compute_risks` for every entry, but the flood model
+    runs once over the stacked feature matrix. Pass `alerts` (same order)
+    when the signals were already fetched concurrently by the caller.
+    """
+    names, matrix = feature_matrix(weather_list)
+    features = feature_dicts(names, matrix)
+    flood_scores = compute_flood_risk_ml_matrix(names, matrix)
+    if alerts is None:
+        alerts = [get_alert_signal(w) for w in weather_list]
+
+    return [
+        _assemble_risks(weather_data, feats, flood_ai, alert)
+        for weather_data, feats, flood_ai, alert in zip(weather_list, features, flood_scores, alerts)
+    ]
@@ -0,0 +1,83 @@
+"""
+Satellite Intelligence (gridded rasters)
+----------------------------------------
+Flood indicators from local satellite-derived grids:
+
+🌧 NASA GPM IMERG-style daily precipitation accumulations (precip_24h, precip_72h)
+🌊 Sentinel SAR / MODIS-style surface-water fraction (surface_water)
+
+Grids are converted offline with `ingest_rasters.py` into memory-mapped
+`.npy` files under backend/rasters (RASTER_DIR); a lookup here is an index
+computation and a page-cache read, never a download or a full-file load.
+"""
+
+from typing import Dict, Any, List, Sequence
+
+import numpy as np
+from .rasters import get_raster_store
+
+# rain accumulation that alone saturates the rain term (mm)
+PRECIP_24H_SATURATION = 100.0
+PRECIP_72H_SATURATION = 200.0
+WATER_WEIGHT = 0.6
+RAIN_WEIGHT = 0.4
+
+LAYERS = ("precip_24h", "precip_72h", "surface_water")
+
+
+def _level(prob: float) -> str:
+    return (
+        "High" if prob > 0.75 else
+        "Medium" if prob > 0.40 else
+        "Low"
+    )
+
+
+def get_satellite_flood_indicators(lats: Sequence[float], lons: Sequence[float]) -> List[Dict[str, Any]]:
+    """Vectorised form of `get_satellite_flood_indicator` for many points."""
+    store = get_raster_store()
+    n = len(lats)
+    values = {}
+    sources = []
+    for name in LAYERS:
+        layer = store.layer(name)
+        values[name] = layer.lookup_many(lats, lons) if layer is not None else np.full(n, np.nan)
+        if layer is not None:
+            sources.append(layer.meta.get("source", name))
+
+    # rain term: 72 h accumulation when available, else 24 h
+    rain = np.where(
+        ~np.isnan(values["precip_72h"]),
+        np.clip(values["precip_72h"] / PRECIP_72H_SATURATION, 0.0, 1.0),
+        np.clip(values["precip_24h"] / PRECIP_24H_SATURATION, 0.0, 1.0),
+    )
+    water = np.clip(values["surface_water"], 0.0, 1.0)
+
+    # weighted mean over whichever terms have data at the point
+    has_rain, has_water = ~np.isnan(rain), ~np.isnan(water)
+    weights = RAIN_WEIGHT * has_rain + WATER_WEIGHT * has_water
+    total = RAIN_WEIGHT * np.nan_to_num(rain) + WATER_WEIGHT * np.nan_to_num(water)
+    prob = np.divide(total, weights, out=np.full(n, np.nan), where=weights > 0)
+
+    source = " + ".join(dict.fromkeys(sources)) or "no raster data"
+    results = []
+    for i in range(n):
+        layer_values = {
+            name: None if np.isnan(values[name][i]) else round(float(values[name][i]), 3)
+            for name in LAYERS
+        }
+        if np.isnan(prob[i]):
+            results.append({"sat_prob": None, "sat_level": "Unknown", "source": source, "layers": layer_values})
+            continue
+        p = float(prob[i])
+        results.append({"sat_prob": round(p, 3), "sat_level": _level(p), "source": source, "layers": layer_values})
+    return results
+
+
+def get_satellite_flood_indicator(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Return satellite-based flood probability for one point:
+    surface-water fraction and recent rain accumulation read from the
+    local grids. `sat_prob` is None where no layer covers the point.
+    """
+    return get_satellite_flood_indicators([lat], [lon])[0]
@@ -0,0 +1,135 @@
+"""
+Single-flight deduplication: concurrent calls with the same key share one
+in-flight execution and all receive its result (or its exception).
+
+Nothing is cached once the call finishes — the next caller starts a fresh
+execution — so this only flattens bursts of identical requests, e.g.
+hundreds of users asking for "Kottayam" within the same few seconds.
+
+The shared call records its stage timings into a dict of its own, which is
+merged into every caller's request timings, so followers asking for
+?timings=true see the stages they waited on.
+"""
+import asyncio
+import contextvars
+import copy
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import Counter, merge_request_timings, register, start_request_timings
+
+SINGLEFLIGHT_CALLS = register(Counter(
+    "gdis_singleflight_calls_total",
+    "Single-flight calls by group and role (leader runs the call, follower shares it)",
+))
+
+
+class _Call:
+    __slots__ = ("done", "result", "timings", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[BaseException] = None
+
+
+def _share(result: Any, timings: Dict[str, float]) -> Any:
+    merge_request_timings(timings)
+    # callers annotate payloads (timings, stale flags), and nested dicts may be
+    # shared state (OVERRIDE_LOCATIONS entries) → every caller gets a deep copy
+    return copy.deepcopy(result) if isinstance(result, dict) else result
+
+
+def _run_timed(fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Dict[str, float]]:
+    # own context and timings dict: stages belong to the shared call, not the leader
+    def run():
+        timings = start_request_timings()
+        return fn(*args, **kwargs), timings
+    return contextvars.copy_context().run(run)
+
+
+async def _arun_timed(fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Dict[str, float]]:
+    # runs as its own task (copied context), so this dict does not leak to the leader
+    timings = start_request_timings()
+    return await fn(*args, **kwargs), timings
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[Hashable, int], "asyncio.Future"] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        SINGLEFLIGHT_CALLS.inc(group=self.name, role="leader" if leader else "follower")
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.result, call.timings)
+
+        try:
+            call.result, call.timings = _run_timed(fn, *args, **kwargs)
+            return _share(call.result, call.timings)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # futures belong to one event loop → key in-flight calls per loop
+        loop_key = (key, id(asyncio.get_running_loop()))
+        with self._lock:
+            pending = self._async_calls.get(loop_key)
+            leader = pending is None
+            if leader:
+                pending = asyncio.ensure_future(_arun_timed(fn, *args, **kwargs))
+                self._async_calls[loop_key] = pending
+                pending.add_done_callback(lambda fut, k=loop_key: self._finish_async(k, fut))
+        SINGLEFLIGHT_CALLS.inc(group=self.name, role="leader" if leader else "follower")
+
+        # shield: one caller hitting its deadline must not cancel the shared call
+        result, timings = await asyncio.shield(pending)
+        return _share(result, timings)
+
+    def _finish_async(self, loop_key: Tuple[Hashable, int], fut: "asyncio.Future") -> None:
+        with self._lock:
+            if self._async_calls.get(loop_key) is fut:
+                del self._async_calls[loop_key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved; every awaiting caller re-raises it
+
+
+def single_flight(name: str, key: Callable[..., Hashable]):
+    """
+    Decorator: calls whose `key(*args, **kwargs)` match while one is in
+    flight share its result. Works for sync and async functions.
+    """
+    group = SingleFlight(name)
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await group.ado(key(*args, **kwargs), fn, *args, **kwargs)
+            async_wrapper.single_flight = group
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return group.do(key(*args, **kwargs), fn, *args, **kwargs)
+        wrapper.single_flight = group
+        return wrapper
+    return decorate
@@ -0,0 +1,154 @@
+"""
+Place-name autocomplete for /places/suggest.
+
+Names we already know how to resolve locally (OVERRIDE_LOCATIONS, positive
+geocode-cache entries, and places users looked up successfully since start)
+sit in one sorted in-memory key list, so a prefix is a bisect plus a short
+scan. Those are ranked by how often they were queried, then population; the
+remaining slots are filled from the offline gazetteer's prefix search.
+
+Every suggestion carries a `query` string that /risk resolves to exactly
+that place without a network round trip.
+"""
+import bisect
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .geo import OVERRIDE_LOCATIONS
+from .geocache import get_geocode_cache
+from .gazetteer import get_gazetteer, normalize_name
+from .metrics import cache_event
+
+SUGGEST_DEFAULT_LIMIT = int(os.getenv("SUGGEST_DEFAULT_LIMIT", "8"))
+SUGGEST_MAX_LIMIT = int(os.getenv("SUGGEST_MAX_LIMIT", "25"))
+# local keys examined per prefix before ranking
+SUGGEST_SCAN_MAX = int(os.getenv("SUGGEST_SCAN_MAX", "2000"))
+# geocode-cache entries loaded into the index at first use
+SUGGEST_CACHE_ENTRIES = int(os.getenv("SUGGEST_CACHE_ENTRIES", "50000"))
+# gazetteer prefix results kept in memory (typing repeats the same prefixes)
+SUGGEST_GAZETTEER_LRU = int(os.getenv("SUGGEST_GAZETTEER_LRU", "4096"))
+
+PlaceId = Tuple[str, str]  # (normalized name, normalized country)
+
+
+def _place_id(name: str, country: str) -> PlaceId:
+    return normalize_name(name or ""), normalize_name(country or "")
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._keys: List[Tuple[str, PlaceId]] = []   # sorted (key, place)
+        self._places: Dict[PlaceId, Dict[str, Any]] = {}
+        self._hits: Dict[PlaceId, int] = {}
+        self._gazetteer_lru: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ---------- build ----------
+
+    def _add(self, query: str, geo: Dict[str, Any]) -> Optional[PlaceId]:
+        if not geo or not geo.get("name"):
+            return None
+        pid = _place_id(geo["name"], geo.get("country"))
+        if pid not in self._places:
+            self._places[pid] = {
+                "name": geo["name"],
+                "country": geo.get("country"),
+                "lat": geo.get("lat"),
+                "lon": geo.get("lon"),
+                "population": geo.get("population"),
+                "query": query,
+            }
+        # reachable by what was typed and by the display name
+        # ("trivandrum" and "thiruvananthapuram")
+        for key in {normalize_name(query), pid[0]}:
+            if not key:
+                continue
+            entry = (key, pid)
+            i = bisect.bisect_left(self._keys, entry)
+            if i == len(self._keys) or self._keys[i] != entry:
+                self._keys.insert(i, entry)
+        return pid
+
+    def warm(self) -> None:
+        """Load overrides and cached geocodes; later lookups are memory only."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for key, geo in OVERRIDE_LOCATIONS.items():
+                self._add(key, geo)
+            for key, geo in get_geocode_cache().positive_entries(SUGGEST_CACHE_ENTRIES):
+                self._add(key, geo)
+            self._loaded = True
+
+    def record(self, query: str, geo: Dict[str, Any]) -> None:
+        """A query that resolved: index its name and count it for ranking."""
+        self.warm()
+        with self._lock:
+            pid = self._add(query.strip(), geo)
+            if pid is not None:
+                self._hits[pid] = self._hits.get(pid, 0) + 1
+
+    # ---------- query ----------
+
+    def _local(self, key: str) -> List[PlaceId]:
+        found: Dict[PlaceId, None] = {}
+        i = bisect.bisect_left(self._keys, (key,))
+        stop = min(len(self._keys), i + SUGGEST_SCAN_MAX)
+        while i < stop and self._keys[i][0].startswith(key):
+            found[self._keys[i][1]] = None
+            i += 1
+        return list(found)
+
+    def _gazetteer(self, key: str, limit: int) -> List[Dict[str, Any]]:
+        gazetteer = get_gazetteer()
+        if gazetteer is None:
+            return []
+        lru_key = f"{limit}:{key}"
+        with self._lock:
+            cached = self._gazetteer_lru.get(lru_key)
+            if cached is not None:
+                self._gazetteer_lru.move_to_end(lru_key)
+                cache_event("suggest_gazetteer", "hit_memory")
+                return cached
+        cache_event("suggest_gazetteer", "miss")
+        places = gazetteer.prefix_search(key, limit)
+        with self._lock:
+            self._gazetteer_lru[lru_key] = places
+            while len(self._gazetteer_lru) > SUGGEST_GAZETTEER_LRU:
+                self._gazetteer_lru.popitem(last=False)
+        return places
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """Up to `limit` places whose name starts with `prefix`, best first."""
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        self.warm()
+
+        with self._lock:
+            local = {pid: dict(self._places[pid], hits=self._hits.get(pid, 0)) for pid in self._local(key)}
+        for geo in self._gazetteer(key, limit):
+            pid = _place_id(geo["name"], geo["country"])
+            if pid in local:
+                if local[pid]["population"] is None:
+                    local[pid]["population"] = geo["population"]
+            else:
+                local[pid] = dict(geo, query=f"{geo['name']}, {geo['country']}", hits=0)
+
+        ranked = sorted(
+            local.values(),
+            key=lambda s: (-s["hits"], -(s["population"] or 0), s["name"]),
+        )
+        return ranked[:limit]
+
+
+_index = SuggestIndex()
+
+
+def get_suggest_index() -> SuggestIndex:
+    return _index
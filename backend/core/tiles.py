@@ -0,0 +1,184 @@
+"""
+Precomputed risk tiles on a regular lat/lon grid.
+
+Tile scheme (plate carrée, y = 0 at the north edge): at zoom z the globe is
+2^(z+1) tiles wide and 2^z tiles tall, so every tile spans 180 / 2^z degrees
+in both directions. Each tile is a `uint8` array of shape (3, N, N) — bands
+flood / heat / storm — holding score × SCORE_SCALE, with NODATA where the
+weather for a cell was unavailable. Tiles are stored as `<dir>/z/x/y.npy`.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from .event_index import EventIndex
+from .model_store import atomic_write
+
+DEFAULT_TILE_DIR = Path(__file__).resolve().parent.parent / "tiles"
+TILE_DIR = Path(os.getenv("RISK_TILE_DIR", str(DEFAULT_TILE_DIR)))
+TILE_SIZE = int(os.getenv("RISK_TILE_SIZE", "32"))  # cells per side
+MAX_ZOOM = 10
+
+BANDS = ("flood", "heat", "storm")
+SCORE_SCALE = 250
+NODATA = 255
+
+# bbox = (min_lon, min_lat, max_lon, max_lat)
+REGIONS: Dict[str, Tuple[float, float, float, float]] = {
+    "global": (-180.0, -90.0, 180.0, 90.0),
+    "kerala": (74.8, 8.1, 77.5, 12.9),
+    "india": (68.0, 6.5, 97.5, 35.5),
+    "indonesia": (95.0, -11.0, 141.0, 6.0),
+    "sri-lanka": (79.5, 5.8, 82.0, 9.9),
+}
+
+
+def tile_span(z: int) -> float:
+    return 180.0 / (2 ** z)
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    span = tile_span(z)
+    min_lon = -180.0 + x * span
+    max_lat = 90.0 - y * span
+    return min_lon, max_lat - span, min_lon + span, max_lat
+
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** (z + 1) and 0 <= y < 2 ** z
+
+
+def tiles_for_bbox(z: int, bbox: Tuple[float, float, float, float]) -> List[Tuple[int, int]]:
+    min_lon, min_lat, max_lon, max_lat = bbox
+    span = tile_span(z)
+    x0 = int(np.floor((min_lon + 180.0) / span))
+    x1 = int(np.ceil((max_lon + 180.0) / span)) - 1
+    y0 = int(np.floor((90.0 - max_lat) / span))
+    y1 = int(np.ceil((90.0 - min_lat) / span)) - 1
+    x0, y0 = max(x0, 0), max(y0, 0)
+    x1, y1 = min(x1, 2 ** (z + 1) - 1), min(y1, 2 ** z - 1)
+    return [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+
+def cell_centers(z: int, x: int, y: int, size: int = TILE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """(lat, lon) grids of shape (size, size); row 0 is the northern edge."""
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    step = (max_lon - min_lon) / size
+    lons = min_lon + (np.arange(size) + 0.5) * step
+    lats = max_lat - (np.arange(size) + 0.5) * step
+    return np.meshgrid(lats, lons, indexing="ij")
+
+
+def tile_path(z: int, x: int, y: int, tile_dir: Path = TILE_DIR) -> Path:
+    return Path(tile_dir) / str(z) / str(x) / f"{y}.npy"
+
+
+def encode_scores(results: List[Optional[Dict[str, Any]]], size: int) -> np.ndarray:
+    """compute_risks outputs (None = no data) → (3, size, size) uint8 tile."""
+    tile = np.full((len(BANDS), size * size), NODATA, dtype=np.uint8)
+    for i, result in enumerate(results):
+        if result is None:
+            continue
+        for b, band in enumerate(BANDS):
+            score = result["risks"][band]["score"]
+            tile[b, i] = int(round(min(max(score, 0.0), 1.0) * SCORE_SCALE))
+    return tile.reshape(len(BANDS), size, size)
+
+
+def decode_scores(tile: np.ndarray) -> np.ndarray:
+    """uint8 tile → float32 scores with NaN for no data."""
+    scores = tile.astype(np.float32) / SCORE_SCALE
+    scores[tile == NODATA] = np.nan
+    return scores
+
+
+def write_tile(tile: np.ndarray, z: int, x: int, y: int, tile_dir: Path = TILE_DIR) -> Path:
+    path = tile_path(z, x, y, tile_dir)
+    # served while a rebuild runs → readers must never see a partial tile
+    atomic_write(path, lambda tmp: np.save(tmp, tile))
+    return path
+
+
+def _union_bbox(bboxes: List[List[float]]) -> List[float]:
+    # (min_lon, min_lat, max_lon, max_lat) covering every box
+    return [min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+            max(b[2] for b in bboxes), max(b[3] for b in bboxes)]
+
+
+def write_meta(
+    tile_dir: Path = TILE_DIR,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    zoom: Optional[int] = None,
+    **extra: Any,
+) -> Path:
+    """
+    Record a build in meta.json. Builds accumulate: every (zoom, bbox) built
+    into `tile_dir` is kept under "builds", with "zooms" and the union "bbox"
+    summarising them; rebuilding the same zoom and bbox replaces its entry.
+    """
+    generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    previous = read_meta(tile_dir) or {}
+    builds = previous.get("builds")
+    if builds is None:
+        # meta.json from before builds were merged held a single bbox/zoom
+        builds = ([{"zoom": previous["zoom"], "bbox": previous["bbox"], "generated_at": previous.get("generated_at")}]
+                  if "zoom" in previous and "bbox" in previous else [])
+    if bbox is not None and zoom is not None:
+        builds = [b for b in builds if not (b["zoom"] == zoom and b["bbox"] == list(bbox))]
+        builds.append({"zoom": zoom, "bbox": list(bbox), "generated_at": generated_at})
+
+    meta = {
+        "scheme": "plate-carree, y=0 north, 2^(z+1) x 2^z tiles",
+        "tile_size": TILE_SIZE,
+        "bands": list(BANDS),
+        "dtype": "uint8",
+        "score_scale": SCORE_SCALE,
+        "nodata": NODATA,
+        "generated_at": generated_at,
+    }
+    if builds:
+        meta["zooms"] = sorted({b["zoom"] for b in builds})
+        meta["bbox"] = _union_bbox([b["bbox"] for b in builds])
+        meta["builds"] = builds
+    meta.update(extra)
+    path = Path(tile_dir) / "meta.json"
+    atomic_write(path, lambda tmp: tmp.write_text(json.dumps(meta, indent=2)))
+    return path
+
+
+def read_meta(tile_dir: Path = TILE_DIR) -> Optional[Dict[str, Any]]:
+    path = Path(tile_dir) / "meta.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def compute_tile(z: int, x: int, y: int, size: int = TILE_SIZE,
+                 gdacs: Optional[EventIndex] = None) -> np.ndarray:
+    """
+    Weather for every cell centre → batched risk scoring → encoded tile.
+    `gdacs` is an EventIndex from `fetch_gdacs_snapshot`, shared across a
+    build; without one the feed is fetched once for this tile.
+    """
+    from .alerts import fetch_gdacs_snapshot, snapshot_flood_event_signal
+    from .geo import fetch_weather_many
+    from .risk_engine import compute_risks_batch
+
+    lats, lons = cell_centers(z, x, y, size)
+    points = list(zip(lats.ravel().tolist(), lons.ravel().tolist()))
+    weathers = fetch_weather_many(points)
+
+    if gdacs is None:
+        gdacs = fetch_gdacs_snapshot() or EventIndex([])
+    ok = [i for i, w in enumerate(weathers) if w is not None]
+    # cells have no place name: alerts come from GDACS event points only
+    alerts = [snapshot_flood_event_signal(gdacs, "", "", *points[i]) for i in ok]
+    scored = compute_risks_batch([weathers[i] for i in ok], alerts=alerts)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(points)
+    for i, result in zip(ok, scored):
+        results[i] = result
+    return encode_scores(results, size)
@@ -0,0 +1,210 @@
+"""
+Pure-NumPy evaluator for the flood XGBoost model.
+
+The booster is exported once (offline, where xgboost is installed) into flat
+arrays — split feature, threshold, children, default direction, leaf value —
+and saved as `.npz`. Serving only needs NumPy: every row walks every tree in
+lock-step, one vectorized gather per tree level.
+
+    python -m core.tree_eval export ml ml/flood_xgb.forest.npz
+"""
+import json
+import math
+import sys
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+SUPPORTED_OBJECTIVES = ("binary:logistic", "reg:logistic", "reg:squarederror")
+
+
+class CompiledForest:
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        base_margin: float,
+        objective: str,
+        feature_names: List[str],
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.objective = objective
+        self.feature_names = feature_names
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.size)
+
+    # ---------------- INFERENCE ----------------
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        flat = X.ravel()
+        # offset of each row in the flattened matrix, broadcast over trees
+        row_base = (np.arange(X.shape[0], dtype=np.int64) * X.shape[1])[:, None]
+        node = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+
+        # leaves point at themselves, so walking max_depth levels is safe
+        for _ in range(self.max_depth):
+            x = flat.take(row_base + self.feature.take(node))
+            go_left = x < self.threshold.take(node)
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.default_left.take(node), go_left)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+
+        return self.value.take(node).sum(axis=1, dtype=np.float64) + self.base_margin
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        margin = self.predict_margin(X)
+        if self.objective in ("binary:logistic", "reg:logistic"):
+            return 1.0 / (1.0 + np.exp(-margin))
+        return margin
+
+    # ---------------- PERSISTENCE ----------------
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            default_left=self.default_left,
+            value=self.value,
+            roots=self.roots,
+            max_depth=np.int64(self.max_depth),
+            base_margin=np.float64(self.base_margin),
+            objective=np.array(self.objective),
+            feature_names=np.array(self.feature_names),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                feature=data["feature"],
+                threshold=data["threshold"],
+                left=data["left"],
+                right=data["right"],
+                default_left=data["default_left"],
+                value=data["value"],
+                roots=data["roots"],
+                max_depth=int(data["max_depth"]),
+                base_margin=float(data["base_margin"]),
+                objective=str(data["objective"]),
+                feature_names=[str(f) for f in data["feature_names"]],
+            )
+
+
+# ---------------- EXPORT (needs xgboost) ----------------
+
+def _parse_base_score(raw: str) -> float:
+    # xgboost >= 2 writes vector-valued params as "[3.1E-1]"
+    return float(str(raw).strip("[]").split(",")[0])
+
+
+def export_booster(booster, feature_names: Optional[List[str]] = None) -> CompiledForest:
+    """Flatten an `xgb.Booster` (or sklearn wrapper) into a CompiledForest."""
+    if hasattr(booster, "get_booster"):
+        booster = booster.get_booster()
+
+    model = json.loads(booster.save_raw(raw_format="json"))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise ValueError(f"Unsupported objective for compiled inference: {objective}")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("Only gbtree boosters can be compiled")
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    if objective in ("binary:logistic", "reg:logistic"):
+        base_margin = math.log(base_score / (1.0 - base_score))
+    else:
+        base_margin = base_score
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+
+    for tree in trees:
+        if any(int(t) != 0 for t in tree.get("split_type", [])):
+            raise ValueError("Categorical splits are not supported by the compiled evaluator")
+
+        lc = np.asarray(tree["left_children"], dtype=np.int64)
+        rc = np.asarray(tree["right_children"], dtype=np.int64)
+        is_leaf = lc == -1
+        idx = np.arange(lc.size, dtype=np.int64)
+
+        feature.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)))
+        conds = np.asarray(tree["split_conditions"], dtype=np.float32)
+        threshold.append(np.where(is_leaf, np.float32(0), conds))
+        # leaf values live in split_conditions for leaf nodes
+        value.append(np.where(is_leaf, conds, np.float32(0)))
+        left.append(np.where(is_leaf, idx, lc) + offset)
+        right.append(np.where(is_leaf, idx, rc) + offset)
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        roots.append(offset)
+
+        # depth via parent links (nodes are stored parent-before-child)
+        depth = np.zeros(lc.size, dtype=np.int64)
+        for n in range(lc.size):
+            if not is_leaf[n]:
+                depth[lc[n]] = depth[n] + 1
+                depth[rc[n]] = depth[n] + 1
+        max_depth = max(max_depth, int(depth.max()))
+        offset += lc.size
+
+    names = feature_names or booster.feature_names or [f"f{i}" for i in range(int(learner["learner_model_param"]["num_feature"]))]
+
+    return CompiledForest(
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float32),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        default_left=np.concatenate(default_left),
+        value=np.concatenate(value).astype(np.float32),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=max_depth,
+        base_margin=base_margin,
+        objective=objective,
+        feature_names=list(names),
+    )
+
+
+def _main(argv: List[str]) -> int:
+    if len(argv) != 3 or argv[0] != "export":
+        print("usage: python -m core.tree_eval export <ml_dir> <out.npz>")
+        return 2
+    from .model_store import load_booster
+
+    loaded = load_booster(Path(argv[1]))
+    if loaded is None:
+        print(f"No flood model artefact found in {argv[1]}")
+        return 1
+    booster, features, _ = loaded
+    forest = export_booster(booster, features)
+    forest.save(Path(argv[2]))
+    print(f"✅ Exported {forest.n_trees} trees (depth ≤ {forest.max_depth}) → {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
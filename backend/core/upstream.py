@@ -0,0 +1,183 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .metrics import observe_upstream
+
+# ---------------- CONFIG ----------------
+# Keep-alive pools are per host; every core module goes through this layer
+# so a /risk request reuses connections instead of re-doing TCP + TLS.
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))        # connections kept per host
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))      # distinct host pools cached
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.3"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Per-host timeouts (seconds), overridable with
+# UPSTREAM_TIMEOUTS="api.reliefweb.int=8,www.gdacs.org=15"
+HOST_TIMEOUTS: Dict[str, float] = {
+    "geocoding-api.open-meteo.com": 5.0,
+    "api.open-meteo.com": 10.0,
+    "api.reliefweb.int": 10.0,
+    "www.gdacs.org": 10.0,
+}
+
+
+def _parse_host_timeouts(raw: str) -> Dict[str, float]:
+    timeouts = {}
+    for item in raw.split(","):
+        host, _, value = item.partition("=")
+        if host.strip() and value.strip():
+            timeouts[host.strip()] = float(value)
+    return timeouts
+
+
+HOST_TIMEOUTS.update(_parse_host_timeouts(os.getenv("UPSTREAM_TIMEOUTS", "")))
+
+
+def timeout_for(url: str) -> float:
+    return HOST_TIMEOUTS.get(urlsplit(url).hostname or "", DEFAULT_TIMEOUT)
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or "unknown"
+
+
+# ---------------- SHARED SYNC SESSION ----------------
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def http_get(url: str, params: Dict[str, Any] = None, timeout: Optional[float] = None) -> requests.Response:
+    """Pooled GET with retries; raises on network errors like `requests.get`."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        resp = get_session().get(url, params=params, timeout=timeout or timeout_for(url))
+        outcome = "ok" if resp.status_code == 200 else "http_error"
+        return resp
+    except requests.Timeout:
+        outcome = "timeout"
+        raise
+    finally:
+        observe_upstream(_host(url), time.perf_counter() - start, outcome)
+
+
+def get_json(url: str, params: Dict[str, Any] = None) -> Any:
+    """JSON body on HTTP 200, None on any failure."""
+    try:
+        resp = http_get(url, params=params)
+        if resp.status_code == 200:
+            return resp.json()
+    except Exception:
+        return None
+    return None
+
+
+# ---------------- SHARED ASYNC CLIENT ----------------
+# One AsyncClient per event loop so connections are reused across requests.
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        limits = httpx.Limits(
+            max_connections=HTTP_POOL_SIZE * HTTP_POOL_HOSTS,
+            max_keepalive_connections=HTTP_POOL_SIZE,
+        )
+        # transport retries cover connect errors; status retries are below
+        transport = httpx.AsyncHTTPTransport(retries=HTTP_RETRIES, limits=limits)
+        _async_client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, transport=transport)
+        _async_client_loop = loop
+    return _async_client
+
+
+async def aclose_async_client() -> None:
+    global _async_client, _async_client_loop
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+async def async_get_json(url: str, params: Dict[str, Any] = None, timeout: Optional[float] = None) -> Any:
+    """
+    Async counterpart of `get_json`: JSON body on HTTP 200, None otherwise.
+    Cancellation (e.g. an overall request deadline) is propagated.
+    """
+    timeout = timeout or timeout_for(url)
+    client = get_async_client()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        for attempt in range(HTTP_RETRIES + 1):
+            resp = await client.get(url, params=params, timeout=timeout)
+            if resp.status_code == 200:
+                data = resp.json()
+                outcome = "ok"
+                return data
+            if resp.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+                outcome = "http_error"
+                return None
+            await asyncio.sleep(HTTP_BACKOFF * (2 ** attempt))
+    except httpx.TimeoutException:
+        outcome = "timeout"
+        return None
+    except (httpx.HTTPError, ValueError):
+        return None
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        observe_upstream(_host(url), time.perf_counter() - start, outcome)
+    return None
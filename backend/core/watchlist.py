@@ -0,0 +1,118 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from .geo import OVERRIDE_LOCATIONS
+from .geocache import normalize_place
+from .pipeline import run_risk_pipeline
+from .metrics import cache_event
+
+# ---------------- WATCHLIST PRE-WARMING ----------------
+# Places we monitor are recomputed in the background on an interval and the
+# latest payload for each is kept in a dict, so /risk answers them in O(1)
+# without touching the network. Everything else is computed live.
+
+WATCHLIST_ENABLED = os.getenv("WATCHLIST_ENABLED", "1") == "1"
+# comma-separated places; default: every entry in OVERRIDE_LOCATIONS
+WATCHLIST = os.getenv("WATCHLIST", "")
+WATCHLIST_INTERVAL_SECONDS = float(os.getenv("WATCHLIST_INTERVAL_SECONDS", "600"))
+WATCHLIST_CONCURRENCY = int(os.getenv("WATCHLIST_CONCURRENCY", "4"))
+# each place starts at a random offset within this window, so a refresh
+# round does not hit the upstreams as one burst
+WATCHLIST_JITTER_SECONDS = float(os.getenv("WATCHLIST_JITTER_SECONDS", "30"))
+# results older than this are not served (e.g. refreshes keep failing)
+WATCHLIST_MAX_AGE_SECONDS = float(os.getenv("WATCHLIST_MAX_AGE_SECONDS", str(3 * WATCHLIST_INTERVAL_SECONDS)))
+
+
+def default_watchlist() -> List[str]:
+    if WATCHLIST.strip():
+        return [p for p in (normalize_place(x) for x in WATCHLIST.split(",")) if p]
+    return list(OVERRIDE_LOCATIONS)
+
+
+class WatchlistScheduler:
+    def __init__(self, places: List[str], interval: float, concurrency: int, jitter: float, max_age: float):
+        self.places = [normalize_place(p) for p in places]
+        self.interval = interval
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.max_age = max_age
+        self._store: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._task: Optional["asyncio.Task"] = None
+
+    # ---------- store ----------
+
+    def get(self, place: str) -> Optional[Dict[str, Any]]:
+        """Latest payload for a watched place, or None (not watched / too old)."""
+        entry = self._store.get(normalize_place(place))
+        if entry is None:
+            return None
+        payload, computed_at = entry
+        if time.time() - computed_at > self.max_age:
+            cache_event("watchlist", "expired")
+            return None
+        cache_event("watchlist", "hit")
+        return dict(payload)  # /risk annotates the payload (timings)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "places": len(self.places),
+            "ready": len(self._store),
+            "oldest_seconds": round(max((now - t for _, t in self._store.values()), default=0.0), 1),
+        }
+
+    # ---------- refresh ----------
+
+    async def _refresh_place(self, place: str, semaphore: asyncio.Semaphore) -> None:
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        async with semaphore:
+            try:
+                payload = await run_risk_pipeline(place)
+            except Exception as e:
+                print(f"⚠ Watchlist refresh failed for {place}: {e.__class__.__name__}")
+                return
+        # a failed refresh keeps serving the previous result until max_age
+        if "error" not in payload:
+            self._store[place] = (payload, time.time())
+            cache_event("watchlist", "refresh_ok")
+        else:
+            cache_event("watchlist", "refresh_failed")
+
+    async def refresh_once(self) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._refresh_place(p, semaphore) for p in self.places))
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await self.refresh_once()
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        """Schedule the refresh loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_watchlist = WatchlistScheduler(
+    default_watchlist(),
+    WATCHLIST_INTERVAL_SECONDS,
+    WATCHLIST_CONCURRENCY,
+    WATCHLIST_JITTER_SECONDS,
+    WATCHLIST_MAX_AGE_SECONDS,
+)
+
+
+def get_watchlist() -> WatchlistScheduler:
+    return _watchlist
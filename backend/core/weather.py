@@ -1,5 +1,5 @@
-import requests
 from typing import Optional, Dict
+from .upstream import http_get
 
 def fetch_weather(lat: float, lon: float) -> Optional[Dict]:
     url = "https://api.open-meteo.com/v1/forecast"
@@ -11,7 +11,7 @@ def fetch_weather(lat: float, lon: float) -> Optional[Dict]:
         "forecast_days": 1,
         "timezone": "auto",
     }
-    resp = requests.get(url, params=params, timeout=10)
+    resp = http_get(url, params=params)
 
     if resp.status_code != 200:
         return None
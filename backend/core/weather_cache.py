@@ -0,0 +1,148 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+from .metrics import cache_event
+
+# ---------------- GRID-CELL WEATHER CACHE ----------------
+# Forecasts are fetched for the centre of a lat/lon grid cell and shared by
+# every location inside it (Kochi and Ernakulam land in the same 0.1° cell).
+# Entries expire at the next upstream hourly update; concurrent misses on the
+# same cell wait for the single in-flight fetch instead of issuing their own.
+
+WEATHER_GRID_RESOLUTION = float(os.getenv("WEATHER_GRID_RESOLUTION", "0.1"))
+WEATHER_TTL_GRACE_SECONDS = float(os.getenv("WEATHER_TTL_GRACE_SECONDS", "120"))
+WEATHER_CACHE_MAX_CELLS = int(os.getenv("WEATHER_CACHE_MAX_CELLS", "10000"))
+
+Cell = Tuple[int, int]
+
+
+def cell_for(lat: float, lon: float, resolution: float = WEATHER_GRID_RESOLUTION) -> Cell:
+    return math.floor(lat / resolution), math.floor(lon / resolution)
+
+
+def cell_center(cell: Cell, resolution: float = WEATHER_GRID_RESOLUTION) -> Tuple[float, float]:
+    # rounded so the upstream sees a stable coordinate string for the cell
+    return round((cell[0] + 0.5) * resolution, 6), round((cell[1] + 0.5) * resolution, 6)
+
+
+def next_update_at(now: Optional[float] = None, grace: float = WEATHER_TTL_GRACE_SECONDS) -> float:
+    """Epoch seconds of the next top-of-hour plus the upstream publish grace."""
+    now = time.time() if now is None else now
+    boundary = (math.floor(now / 3600) + 1) * 3600 + grace
+    # still inside the grace window of the current hour → that update is pending
+    if boundary - 3600 > now:
+        return boundary - 3600
+    return boundary
+
+
+class WeatherCellCache:
+    def __init__(self, resolution: float, max_cells: int):
+        self.resolution = resolution
+        self.max_cells = max_cells
+        self._entries: "OrderedDict[Cell, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Cell, threading.Event] = {}
+        self._inflight_async: Dict[Cell, "asyncio.Future"] = {}
+
+    # ---------- storage ----------
+
+    def _lookup(self, cell: Cell) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(cell)
+        if entry is None:
+            return None
+        weather, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[cell]
+            return None
+        self._entries.move_to_end(cell)
+        return weather
+
+    def _store(self, cell: Cell, weather: Dict[str, Any]) -> None:
+        self._entries[cell] = (weather, next_update_at())
+        self._entries.move_to_end(cell)
+        while len(self._entries) > self.max_cells:
+            self._entries.popitem(last=False)
+
+    def peek(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            weather = self._lookup(cell_for(lat, lon, self.resolution))
+        # callers annotate the payload (location_name) → hand out copies
+        return dict(weather) if weather is not None else None
+
+    # ---------- sync path ----------
+
+    def get_or_fetch(self, lat: float, lon: float, fetch: Callable[[float, float], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        cell = cell_for(lat, lon, self.resolution)
+        while True:
+            with self._lock:
+                weather = self._lookup(cell)
+                if weather is not None:
+                    cache_event("weather", "hit")
+                    return dict(weather)
+                waiter = self._inflight.get(cell)
+                if waiter is None:
+                    waiter = self._inflight[cell] = threading.Event()
+                    leader = True
+                else:
+                    leader = False
+            cache_event("weather", "miss" if leader else "coalesced")
+
+            if not leader:
+                waiter.wait()
+                with self._lock:
+                    weather = self._lookup(cell)
+                if weather is not None:
+                    return dict(weather)
+                # leader failed → no cached result to share; fetch ourselves
+                return fetch(*cell_center(cell, self.resolution))
+
+            try:
+                weather = fetch(*cell_center(cell, self.resolution))
+                if weather is not None:
+                    with self._lock:
+                        self._store(cell, weather)
+                return dict(weather) if weather is not None else None
+            finally:
+                with self._lock:
+                    self._inflight.pop(cell, None)
+                waiter.set()
+
+    # ---------- async path ----------
+
+    async def aget_or_fetch(self, lat: float, lon: float, fetch: Callable[[float, float], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        cell = cell_for(lat, lon, self.resolution)
+        with self._lock:
+            weather = self._lookup(cell)
+            if weather is not None:
+                cache_event("weather", "hit")
+                return dict(weather)
+            pending = self._inflight_async.get(cell)
+            if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+                pending = asyncio.ensure_future(fetch(*cell_center(cell, self.resolution)))
+                self._inflight_async[cell] = pending
+                pending.add_done_callback(lambda fut, cell=cell: self._finish_async(cell, fut))
+                cache_event("weather", "miss")
+            else:
+                cache_event("weather", "coalesced")
+
+        # shield: one waiter hitting its deadline must not cancel the others' fetch
+        weather = await asyncio.shield(pending)
+        return dict(weather) if weather is not None else None
+
+    def _finish_async(self, cell: Cell, fut: "asyncio.Future") -> None:
+        with self._lock:
+            if self._inflight_async.get(cell) is fut:
+                del self._inflight_async[cell]
+            if not fut.cancelled() and fut.exception() is None and fut.result() is not None:
+                self._store(cell, fut.result())
+
+
+_weather_cache = WeatherCellCache(WEATHER_GRID_RESOLUTION, WEATHER_CACHE_MAX_CELLS)
+
+
+def get_weather_cache() -> WeatherCellCache:
+    return _weather_cache
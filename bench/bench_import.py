@@ -0,0 +1,69 @@
+"""
+Cold-start benchmark for the risk engine.
+
+Measures, in fresh interpreters, how long `import core.risk_engine` takes
+(must stay cheap: no xgboost, no model unpickling) and how long the first
+`load_model()` takes for the artefact on disk.
+
+    python bench/bench_import.py [--runs 5] [--max-import-ms 400]
+
+Exits non-zero if the median import time exceeds --max-import-ms.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKEND = ROOT / "backend"
+
+_PROBE = """
+import time, sys, json
+t0 = time.perf_counter()
+import core.risk_engine as re_
+t1 = time.perf_counter()
+heavy = [m for m in ("xgboost", "joblib", "sklearn") if m in sys.modules]
+re_.load_model()
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "load_ms": (t2 - t1) * 1e3, "heavy_at_import": heavy}))
+"""
+
+
+def _probe() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=str(BACKEND),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # the model loader prints a status line before the JSON
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    runs = [_probe() for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "import_ms_median": statistics.median(r["import_ms"] for r in runs),
+        "load_ms_median": statistics.median(r["load_ms"] for r in runs),
+        "heavy_modules_at_import": runs[0]["heavy_at_import"],
+        "max_import_ms": args.max_import_ms,
+    }
+    results["ok"] = (
+        results["import_ms_median"] <= args.max_import_ms
+        and not results["heavy_modules_at_import"]
+    )
+    print(json.dumps(results, indent=2))
+    return 0 if results["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Parity check + latency benchmark: compiled NumPy forest vs. xgboost booster.
+
+    python bench/bench_tree_eval.py [--ml-dir backend/ml] [--rows 10000]
+
+Exits non-zero if the two engines disagree by more than --tolerance.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from core.model_store import load_booster  # noqa: E402
+from core.tree_eval import export_booster  # noqa: E402
+
+# rough ranges of the training features, used to draw synthetic rows
+FEATURE_RANGES = {
+    "rain_last_1d": 120.0,
+    "rain_last_3d": 300.0,
+    "rain_last_7d": 600.0,
+    "humidity": 100.0,
+    "wind_speed": 120.0,
+    "elevation": 2000.0,
+}
+
+
+def _time_per_call(fn, repeats: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ml-dir", default=str(ROOT / "backend" / "ml"))
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    parser.add_argument("--repeats", type=int, default=500)
+    args = parser.parse_args()
+
+    import xgboost as xgb
+
+    loaded = load_booster(Path(args.ml_dir))
+    if loaded is None:
+        print(f"No flood model artefact found in {args.ml_dir}")
+        return 2
+    booster, names, _ = loaded
+    forest = export_booster(booster, names)
+
+    rng = np.random.default_rng(42)
+    scale = np.array([FEATURE_RANGES.get(n, 1.0) for n in names], dtype=np.float32)
+    X = (rng.random((args.rows, len(names)), dtype=np.float32) * scale).astype(np.float32)
+    X[rng.random(X.shape) < 0.02] = np.nan  # exercise default directions
+
+    reference = booster.predict(xgb.DMatrix(X, feature_names=names))
+    compiled = forest.predict(X)
+    max_diff = float(np.max(np.abs(reference - compiled)))
+
+    single = X[:1]
+    results = {
+        "trees": forest.n_trees,
+        "max_depth": forest.max_depth,
+        "rows": args.rows,
+        "max_abs_diff": max_diff,
+        "parity_ok": max_diff <= args.tolerance,
+        "single_row_us": {
+            "xgboost": _time_per_call(lambda: booster.predict(xgb.DMatrix(single, feature_names=names)), args.repeats) * 1e6,
+            "numpy": _time_per_call(lambda: forest.predict(single), args.repeats) * 1e6,
+        },
+        "batch_rows_per_s": {
+            "xgboost": args.rows / _time_per_call(lambda: booster.predict(xgb.DMatrix(X, feature_names=names)), 5),
+            "numpy": args.rows / _time_per_call(lambda: forest.predict(X), 5),
+        },
+    }
+    print(json.dumps(results, indent=2))
+    return 0 if results["parity_ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
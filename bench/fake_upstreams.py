@@ -0,0 +1,218 @@
+"""
+Local stand-ins for every upstream the backend calls, so benchmarks run offline.
+
+Serves Open-Meteo geocoding (/v1/search) and forecast (/v1/forecast),
+ReliefWeb (/v1/disasters) and GDACS (/gdacsapi/api/events/geteventlist/SEARCH)
+with configurable latency, error rate and payload size.
+
+    python bench/fake_upstreams.py --port 9100 --latency-ms 80 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 50.0     # mean added latency per request
+    jitter_ms: float = 20.0      # uniform ± jitter
+    error_rate: float = 0.0      # fraction of requests answered with HTTP 503
+    payload_items: int = 20      # ReliefWeb entries / GDACS events per response
+    forecast_hours: int = 24     # hourly samples when the request has no past_days
+
+
+def _seed(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+
+def _geocode(params: Dict[str, str], cfg: FakeConfig) -> Dict:
+    name = params.get("name", "")
+    if name.startswith("unknown"):
+        return {"generationtime_ms": 0.1}
+    rng = random.Random(_seed(name))
+    return {
+        "results": [{
+            "name": name.title(),
+            "country": "Benchland",
+            "latitude": round(rng.uniform(-60, 60), 4),
+            "longitude": round(rng.uniform(-180, 180), 4),
+        }]
+    }
+
+
+def _forecast(params: Dict[str, str], cfg: FakeConfig) -> Dict:
+    lat, lon = float(params.get("latitude", 0)), float(params.get("longitude", 0))
+    rng = random.Random(_seed(f"{lat:.3f},{lon:.3f}"))
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if "past_days" in params:
+        # like Open-Meteo: whole days, from midnight `past_days` ago through the forecast days
+        days = int(params["past_days"]) + int(params.get("forecast_days", 1))
+        first = now.replace(hour=0) - timedelta(days=int(params["past_days"]))
+        hours = [first + timedelta(hours=i) for i in range(days * 24)]
+    else:
+        hours = [now - timedelta(hours=cfg.forecast_hours - 1 - i) for i in range(cfg.forecast_hours)]
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current_weather": {
+            "temperature": round(rng.uniform(15, 42), 1),
+            "windspeed": round(rng.uniform(0, 90), 1),
+            "time": now.strftime("%Y-%m-%dT%H:%M"),
+        },
+        "hourly": {
+            "time": [h.strftime("%Y-%m-%dT%H:%M") for h in hours],
+            "temperature_2m": [round(rng.uniform(15, 40), 1) for _ in hours],
+            "relativehumidity_2m": [rng.randint(40, 100) for _ in hours],
+            "precipitation": [round(max(0.0, rng.gauss(1.0, 3.0)), 1) for _ in hours],
+            "windgusts_10m": [round(rng.uniform(0, 100), 1) for _ in hours],
+        },
+    }
+
+
+def _reliefweb(params: Dict[str, str], cfg: FakeConfig) -> Dict:
+    query = params.get("query[value]", "")
+    now = datetime.now(timezone.utc)
+    return {
+        "data": [
+            {
+                "fields": {
+                    "name": f"{query} Floods - {now.year} #{i}" if i % 5 == 0 else f"Drought report #{i}",
+                    "type": [{"name": "Flood" if i % 5 == 0 else "Drought"}],
+                    "date": {"created": (now - timedelta(days=i % 10)).isoformat()},
+                }
+            }
+            for i in range(cfg.payload_items)
+        ]
+    }
+
+
+def _gdacs(params: Dict[str, str], cfg: FakeConfig) -> Dict:
+    rng = random.Random(42)
+    features = []
+    for i in range(cfg.payload_items):
+        lat, lon = rng.uniform(-40, 40), rng.uniform(-180, 180)
+        features.append({
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "bbox": [lon - 1, lat - 1, lon + 1, lat + 1],
+            "properties": {"eventname": f"Flood in Benchtown-{i}", "country": "Benchland", "iso3": "BCH"},
+        })
+    return {"features": features}
+
+
+ROUTES = {
+    "/v1/search": _geocode,
+    "/v1/forecast": _forecast,
+    "/v1/disasters": _reliefweb,
+    "/gdacsapi/api/events/geteventlist/SEARCH": _gdacs,
+}
+
+
+def _make_handler(cfg: FakeConfig, counts: Dict[str, int], lock: threading.Lock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+        def setup(self):
+            super().setup()
+            # headers and body go out as separate writes; without this,
+            # Nagle + delayed ACK adds ~40 ms to every keep-alive response
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            route = ROUTES.get(url.path)
+            with lock:
+                counts[url.path] = counts.get(url.path, 0) + 1
+
+            delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000.0
+            time.sleep(delay)
+
+            if route is None:
+                return self._send(404, {"error": "unknown route"})
+            if random.random() < cfg.error_rate:
+                return self._send(503, {"error": "injected failure"})
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            self._send(200, route(params, cfg))
+
+        def _send(self, status: int, body: Dict) -> None:
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class FakeUpstreams:
+    def __init__(self, cfg: FakeConfig, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _make_handler(cfg, self.counts, self._lock))
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.server_address[:2]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points every backend upstream at this server."""
+        base = self.base_url
+        return {
+            "OPEN_METEO_GEOCODING_URL": f"{base}/v1/search",
+            "OPEN_METEO_FORECAST_URL": f"{base}/v1/forecast",
+            "RELIEFWEB_DISASTERS_URL": f"{base}/v1/disasters",
+            "GDACS_SEARCH_URL": f"{base}/gdacsapi/api/events/geteventlist/SEARCH",
+        }
+
+    def start(self) -> "FakeUpstreams":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline stand-ins for Open-Meteo, ReliefWeb and GDACS")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-items", type=int, default=20)
+    args = parser.parse_args()
+
+    fakes = FakeUpstreams(
+        FakeConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.payload_items),
+        port=args.port,
+    ).start()
+    for key, value in fakes.env().items():
+        print(f"export {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fakes.stop()
+
+
+if __name__ == "__main__":
+    main()
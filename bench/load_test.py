@@ -0,0 +1,180 @@
+"""
+End-to-end load test of the FastAPI app against local upstream stand-ins.
+
+Starts bench/fake_upstreams.py in-process and `uvicorn main:app` as a child
+process pointed at it, then drives POST /risk at fixed concurrency levels.
+Reports throughput, p50/p95/p99 latency, error count and the server's peak
+RSS, and writes everything to a JSON file. Fully offline.
+
+    python bench/load_test.py --concurrency 1 8 32 --requests 400 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from fake_upstreams import FakeConfig, FakeUpstreams
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    # VmHWM = peak resident set size (Linux only)
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        return None
+    return None
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+async def _drive(base_url: str, places: List[str], concurrency: int, total: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    resp = await client.post("/risk", json={"location": places[i % len(places)]})
+                    ok = resp.status_code == 200 and "error" not in resp.json()
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += 0 if ok else 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("backend exited during startup")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("backend did not become ready")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline load test for POST /risk")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--places", type=int, default=200, help="distinct place names (controls cache hit ratio)")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-items", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--out", default=str(ROOT / "bench" / "results" / "load_test.json"))
+    args = parser.parse_args()
+
+    cfg = FakeConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.payload_items)
+    fakes = FakeUpstreams(cfg).start()
+    port = _free_port()
+    cache_dir = tempfile.mkdtemp(prefix="gdis-bench-")
+
+    env = dict(os.environ)
+    env.update(fakes.env())
+    # every on-disk store is isolated under cache_dir (the gazetteer, tile and
+    # raster dirs stay empty), and watchlist pre-warming is off, so the run
+    # neither touches backend/cache nor competes with background upstream calls
+    env.update({
+        "PYTHONPATH": str(ROOT / "backend") + os.pathsep + env.get("PYTHONPATH", ""),
+        "GEOCODE_CACHE_PATH": str(Path(cache_dir) / "geocode.sqlite3"),
+        "HISTORY_DB_PATH": str(Path(cache_dir) / "history.sqlite3"),
+        "GAZETTEER_DIR": str(Path(cache_dir) / "gazetteer"),
+        "RISK_TILE_DIR": str(Path(cache_dir) / "tiles"),
+        "RASTER_DIR": str(Path(cache_dir) / "rasters"),
+        "WATCHLIST_ENABLED": "0",
+    })
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=str(ROOT), env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    places = [f"benchtown {i}" for i in range(args.places)]
+
+    try:
+        _wait_ready(base_url + "/", proc)
+        levels = []
+        for c in args.concurrency:
+            result = asyncio.run(_drive(base_url, places, c, args.requests))
+            result["server_peak_rss_mb"] = _peak_rss_mb(proc.pid)
+            levels.append(result)
+            print(
+                f"c={c:<4} {result['throughput_rps']:8.1f} req/s  "
+                f"p50={result['p50_ms']:7.1f}ms p95={result['p95_ms']:7.1f}ms "
+                f"p99={result['p99_ms']:7.1f}ms errors={result['errors']}"
+            )
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        fakes.stop()
+
+    report = {
+        "benchmark": "load_test",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "upstream": vars(cfg),
+        "places": args.places,
+        "workers": args.workers,
+        "upstream_calls": fakes.counts,
+        "levels": levels,
+    }
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"📄 {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Microbenchmarks for the hot functions, run offline against local stand-ins.
+
+    python bench/microbench.py [--number 2000] [--out bench/results/microbench.json]
+
+Covers compute_flood_risk_ml (1 row, a 500-row batch, and 64 concurrent
+async callers through the micro-batching dispatcher; reported per row),
+compute_risks and get_flood_event_signal (ReliefWeb served by the local fake with
+--latency-ms, default 0, so the number is mostly client + parsing cost).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fake_upstreams import FakeConfig, FakeUpstreams
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _bench(fn, number: int, repeat: int = 5) -> dict:
+    fn()  # warm-up (model load, connection pools, caches)
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - start) / number)
+    return {"number": number, "repeat": repeat, "best_us": min(runs) * 1e6, "median_us": statistics.median(runs) * 1e6}
+
+
+def _per_row(result: dict, rows: int) -> dict:
+    return dict(result, rows=rows, best_us=result["best_us"] / rows, median_us=result["median_us"] / rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline microbenchmarks for the risk engine")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--out", default=str(ROOT / "bench" / "results" / "microbench.json"))
+    args = parser.parse_args()
+
+    fakes = FakeUpstreams(FakeConfig(latency_ms=args.latency_ms, jitter_ms=0.0)).start()
+    # must be set before core modules read their URLs
+    os.environ.update(fakes.env())
+    sys.path.insert(0, str(ROOT / "backend"))
+
+    from core.alerts import get_flood_event_signal, refresh_gdacs_feed
+    from core.risk_engine import (
+        compute_flood_risk_ml, compute_flood_risk_ml_async, compute_flood_risk_ml_batch, compute_risks,
+        get_inference_dispatcher,
+    )
+    from fake_upstreams import _forecast
+
+    refresh_gdacs_feed()
+    weather = _forecast({"latitude": "9.59", "longitude": "76.52"}, fakes.cfg)
+    weather["location_name"] = "Kottayam"
+    features = {
+        "rain_last_1d": 12.0, "rain_last_3d": 40.0, "rain_last_7d": 90.0,
+        "humidity": 85.0, "wind_speed": 20.0, "elevation": 150.0,
+    }
+    batch = [dict(features, rain_last_3d=float(i % 200)) for i in range(500)]
+    io_number = max(1, args.number // 10)
+    concurrent = [dict(features, rain_last_3d=float(i)) for i in range(64)]
+    loop = asyncio.new_event_loop()
+
+    async def _gather_rows():
+        await asyncio.gather(*(compute_flood_risk_ml_async(row) for row in concurrent))
+
+    try:
+        results = {
+            "compute_flood_risk_ml": _bench(lambda: compute_flood_risk_ml(features), args.number),
+            "compute_flood_risk_ml_batch_500": _bench(lambda: compute_flood_risk_ml_batch(batch), max(1, args.number // 100)),
+            "compute_flood_risk_ml_async_x64": _per_row(
+                _bench(lambda: loop.run_until_complete(_gather_rows()), max(1, args.number // 64)), len(concurrent)
+            ),
+            "compute_risks": _bench(lambda: compute_risks(dict(weather)), io_number),
+            "get_flood_event_signal": _bench(lambda: get_flood_event_signal("Kottayam", "India", 9.59, 76.52), io_number),
+        }
+    finally:
+        get_inference_dispatcher().stop()
+        loop.close()
+        fakes.stop()
+
+    report = {
+        "benchmark": "microbench",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "upstream_latency_ms": args.latency_ms,
+        "results": results,
+    }
+    for name, r in results.items():
+        print(f"{name:<34} best {r['best_us']:10.1f} µs   median {r['median_us']:10.1f} µs")
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"📄 {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# =============================
+# Build Offline Gazetteer
+# =============================
+# Converts a GeoNames dump (allCountries / cities15000 .txt or .zip) into the
+# memory-mapped index served by core.gazetteer, so geocoding needs no network.
+#
+#   python build_gazetteer.py cities15000.zip --countries countryInfo.txt
+#   python build_gazetteer.py allCountries.zip --countries countryInfo.txt --min-population 1000 --alternates
+
+import argparse
+import io
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+from core.gazetteer import GAZETTEER_DIR, build_gazetteer  # noqa: E402
+
+# GeoNames main table columns
+NAME, ASCIINAME, ALTERNATES, LAT, LON, FEATURE_CLASS, COUNTRY, POPULATION = 1, 2, 3, 4, 5, 6, 8, 14
+
+
+def _open_text(path: Path) -> TextIO:
+    if path.suffix.lower() == ".zip":
+        archive = zipfile.ZipFile(path)
+        member = next(n for n in archive.namelist() if n.endswith(".txt") and "readme" not in n.lower())
+        return io.TextIOWrapper(archive.open(member), encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_country_names(path: Optional[Path]) -> Dict[str, str]:
+    """ISO2 → country name from GeoNames countryInfo.txt."""
+    names: Dict[str, str] = {}
+    if path is None:
+        return names
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) > 4:
+                names[cols[0]] = cols[4]
+    return names
+
+
+def read_geonames(
+    path: Path,
+    countries: Dict[str, str],
+    feature_classes: Set[str],
+    min_population: int,
+    alternates: bool,
+) -> Iterator[Tuple[str, float, float, str, str, int, List[str]]]:
+    with _open_text(path) as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15 or cols[FEATURE_CLASS] not in feature_classes:
+                continue
+            population = int(cols[POPULATION] or 0)
+            if population < min_population:
+                continue
+            names = [cols[NAME], cols[ASCIINAME]]
+            if alternates and cols[ALTERNATES]:
+                names.extend(cols[ALTERNATES].split(","))
+            code = cols[COUNTRY]
+            yield (
+                cols[NAME],
+                float(cols[LAT]),
+                float(cols[LON]),
+                code,
+                countries.get(code, code),
+                population,
+                names,
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer from a GeoNames dump")
+    parser.add_argument("dump", help="GeoNames table (.txt or .zip), e.g. cities15000.zip")
+    parser.add_argument("--countries", help="GeoNames countryInfo.txt, for country names instead of ISO codes")
+    parser.add_argument("--feature-classes", default="P,A",
+                        help="GeoNames feature classes to keep (P = populated places, A = admin areas)")
+    parser.add_argument("--min-population", type=int, default=0)
+    parser.add_argument("--alternates", action="store_true", help="also index alternate names")
+    parser.add_argument("--out", default=str(GAZETTEER_DIR))
+    args = parser.parse_args()
+
+    start = time.time()
+    countries = read_country_names(Path(args.countries) if args.countries else None)
+    places = read_geonames(
+        Path(args.dump),
+        countries,
+        set(args.feature_classes.split(",")),
+        args.min_population,
+        args.alternates,
+    )
+    meta = build_gazetteer(places, Path(args.out), source=Path(args.dump).name)
+    print(f"📍 {meta['places']} places, {meta['keys']} names, {meta['countries']} countries "
+          f"→ {args.out} ({time.time() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# =============================
+# Precompute Risk Tiles
+# =============================
+# Runs the compute_risks logic over a regular lat/lon grid and writes
+# compact uint8 tiles that the map frontend can fetch directly
+# from GET /tiles/{z}/{x}/{y}.npy.
+#
+#   python build_risk_tiles.py --region kerala --zoom 6
+#   python build_risk_tiles.py --bbox 74.8,8.1,77.5,12.9 --zoom 7
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+from core import tiles  # noqa: E402
+from core.alerts import fetch_gdacs_snapshot  # noqa: E402
+from core.event_index import EventIndex  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompute flood/heat/storm risk tiles")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--region", choices=sorted(tiles.REGIONS))
+    where.add_argument("--bbox", help="min_lon,min_lat,max_lon,max_lat")
+    parser.add_argument("--zoom", type=int, default=5)
+    parser.add_argument("--out", default=str(tiles.TILE_DIR))
+    args = parser.parse_args()
+
+    if not 0 <= args.zoom <= tiles.MAX_ZOOM:
+        parser.error(f"--zoom must be between 0 and {tiles.MAX_ZOOM}")
+    bbox = tiles.REGIONS[args.region] if args.region else tuple(float(v) for v in args.bbox.split(","))
+
+    # one GDACS fetch for the whole run; no background refresher in a batch job
+    gdacs = fetch_gdacs_snapshot()
+    if gdacs is None:
+        print("⚠ GDACS feed unavailable — tiles will carry ML/heat/storm scores only")
+        gdacs = EventIndex([])
+
+    todo = tiles.tiles_for_bbox(args.zoom, bbox)
+    print(f"🗺  {len(todo)} tiles at z={args.zoom} ({tiles.TILE_SIZE}x{tiles.TILE_SIZE} cells each)")
+
+    start = time.time()
+    for n, (x, y) in enumerate(todo, 1):
+        tile = tiles.compute_tile(args.zoom, x, y, gdacs=gdacs)
+        tiles.write_tile(tile, args.zoom, x, y, Path(args.out))
+        print(f"  [{n}/{len(todo)}] z={args.zoom} x={x} y={y}")
+
+    # merged with earlier builds: other regions and zooms stay listed
+    tiles.write_meta(Path(args.out), bbox=bbox, zoom=args.zoom)
+    print(f"✅ Done in {time.time() - start:.1f}s → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# =============================
+# Ingest Satellite Rasters
+# =============================
+# Offline step: converts gridded products into the memory-mapped layout
+# served by core.rasters / core.satellite (float32 .npy + .json sidecar).
+# Serving never parses source formats — it only maps the .npy files.
+#
+#   python ingest_rasters.py precip_24h imerg_20261016.asc --source "GPM IMERG Late"
+#   python ingest_rasters.py surface_water water.npy --west 60 --north 40 --cellsize 0.1
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+from core.model_store import atomic_write  # noqa: E402
+from core.rasters import RASTER_DIR  # noqa: E402
+
+
+def read_esri_ascii(path: Path) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """ESRI ASCII grid (.asc): key/value header, then rows north → south."""
+    header: Dict[str, str] = {}
+    with open(path) as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            parts = line.split()
+            if len(parts) != 2 or not parts[0][0].isalpha():
+                f.seek(pos)
+                break
+            header[parts[0].lower()] = parts[1]
+        grid = np.loadtxt(f, dtype=np.float32, ndmin=2)
+
+    nrows, ncols = int(header["nrows"]), int(header["ncols"])
+    if grid.shape != (nrows, ncols):
+        raise ValueError(f"{path}: header says {nrows}x{ncols}, data is {grid.shape[0]}x{grid.shape[1]}")
+    cellsize = float(header["cellsize"])
+    if "xllcenter" in header:
+        west = float(header["xllcenter"]) - cellsize / 2
+        south = float(header["yllcenter"]) - cellsize / 2
+    else:
+        west, south = float(header["xllcorner"]), float(header["yllcorner"])
+    meta = {"west": west, "north": south + nrows * cellsize, "cellsize": cellsize}
+    if "nodata_value" in header:
+        meta["nodata"] = float(header["nodata_value"])
+    return grid, meta
+
+
+def ingest(name: str, grid: np.ndarray, meta: Dict[str, Any], out_dir: Path) -> Path:
+    grid = np.ascontiguousarray(grid, dtype=np.float32)
+    nodata = meta.pop("nodata", None)
+    if nodata is not None:
+        grid[grid == nodata] = np.nan  # served grids mark missing cells as NaN
+    meta.update(
+        rows=int(grid.shape[0]),
+        cols=int(grid.shape[1]),
+        nodata=None,
+        ingested_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    )
+
+    out = out_dir / f"{name}.npy"
+    # grid first, sidecar last; both renamed into place atomically
+    atomic_write(out, lambda tmp: np.save(tmp, grid))
+    atomic_write(out.with_suffix(".json"), lambda tmp: tmp.write_text(json.dumps(meta, indent=2)))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert a gridded product into a served raster layer")
+    parser.add_argument("layer", help="layer name, e.g. precip_24h, precip_72h, surface_water")
+    parser.add_argument("input", help=".asc (ESRI ASCII grid) or .npy (2-D, rows north → south)")
+    parser.add_argument("--west", type=float, help="western edge (deg), .npy input only")
+    parser.add_argument("--north", type=float, help="northern edge (deg), .npy input only")
+    parser.add_argument("--cellsize", type=float, help="cell size (deg), .npy input only")
+    parser.add_argument("--nodata", type=float, help="value marking missing cells")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply values (unit conversion)")
+    parser.add_argument("--units", default="")
+    parser.add_argument("--source", default="", help="product name shown in indicator payloads")
+    parser.add_argument("--date", default="", help="observation date of the grid")
+    parser.add_argument("--out", default=str(RASTER_DIR))
+    args = parser.parse_args()
+
+    path = Path(args.input)
+    if path.suffix.lower() == ".asc":
+        grid, meta = read_esri_ascii(path)
+    elif path.suffix.lower() == ".npy":
+        if None in (args.west, args.north, args.cellsize):
+            parser.error(".npy input needs --west, --north and --cellsize")
+        grid = np.load(path)
+        if grid.ndim != 2:
+            parser.error(f"{path} is {grid.ndim}-D, expected a 2-D grid")
+        meta = {"west": args.west, "north": args.north, "cellsize": args.cellsize}
+    else:
+        parser.error("input must be .asc or .npy")
+
+    if args.nodata is not None:
+        meta["nodata"] = args.nodata
+    if args.scale != 1.0:
+        nodata = meta.get("nodata")
+        mask = grid == nodata if nodata is not None else None
+        grid = grid.astype(np.float32) * args.scale
+        if mask is not None:
+            grid[mask] = nodata
+    meta.update(units=args.units, source=args.source or args.layer, date=args.date)
+
+    out = ingest(args.layer, grid, meta, Path(args.out))
+    print(f"✅ {args.layer}: {grid.shape[0]}x{grid.shape[1]} cells @ {meta['cellsize']}° → {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
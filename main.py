@@ -1,10 +1,37 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import codecs
+import csv
+import itertools
+import json
+import os
 import requests
-from core.risk_engine import compute_risks
+from core.risk_engine import compute_risks_batch, get_alert_signal, get_inference_dispatcher, load_model, model_version, MODEL_PRELOAD
 from core.geo import geocode_place, fetch_weather
+from core.alerts import start_gdacs_refresher, stop_gdacs_refresher
+from core.pipeline import build_risk_payload, run_point_pipeline, run_risk_pipeline, stream_risk_pipeline, STREAM_CONCURRENCY
+from core.points import get_location_index
+from core.upstream import aclose_async_client, close_session
+from core import tiles
+from core.metrics import render_prometheus, start_request_timings, timed
+from core.breaker import breaker_states
+from core.watchlist import WATCHLIST_ENABLED, get_watchlist
+from core.history import BUCKETS, HISTORY_QUERY_LIMIT, get_history, location_key, record_result
+from core.suggest import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT, get_suggest_index
+
+# Batch limits
+BATCH_MAX_LOCATIONS = int(os.getenv("BATCH_MAX_LOCATIONS", "1000"))
+BATCH_FETCH_WORKERS = int(os.getenv("BATCH_FETCH_WORKERS", "16"))
+STREAM_MAX_LOCATIONS = int(os.getenv("STREAM_MAX_LOCATIONS", "50000"))
+# attach per-stage timings (ms) to every /risk response, not only on ?timings=true
+RESPONSE_TIMINGS = os.getenv("RESPONSE_TIMINGS", "0") == "1"
 
 app = FastAPI(title="Global Disaster Intelligence System - Backend")
 
@@ -17,6 +44,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ------------------ Lifecycle ------------------
+@app.on_event("startup")
+def _startup():
+    # warm the shared GDACS feed before the first /risk arrives
+    start_gdacs_refresher()
+    if MODEL_PRELOAD:
+        load_model()
+    get_suggest_index().warm()  # overrides + cached names → autocomplete index
+    get_location_index().warm()  # KD-trees for /risk/point reverse lookup
+
+
+@app.on_event("startup")
+async def _start_watchlist():
+    # pre-warm watched places on the server's event loop
+    if WATCHLIST_ENABLED:
+        get_watchlist().start()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await get_watchlist().stop()
+    stop_gdacs_refresher()
+    get_inference_dispatcher().stop()
+    get_history().stop()  # flush queued history rows
+    await aclose_async_client()
+    close_session()
+
+
 # ------------------ Pydantic Models ------------------
 class RiskRequest(BaseModel):
     location: str
@@ -28,42 +83,302 @@ class RiskResponse(BaseModel):
     ai_insight: str
     location: Dict
     weather: Dict
+    satellite: Optional[Dict] = None
+    timings: Optional[Dict] = None
+    point: Optional[Dict] = None
 
+class PointRequest(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
 
-# ----------------------- API Routes -----------------------
+class BatchPointRequest(BaseModel):
+    points: List[PointRequest]
 
-@app.post("/risk", response_model=RiskResponse)
-def risk(req: RiskRequest):
-    # Geocode → get lat/lon
-    geo = geocode_place(req.location)
+class BatchRiskRequest(BaseModel):
+    locations: List[str]
+
+class BatchRiskResponse(BaseModel):
+    results: List[Dict]
+    count: int
+    errors: int
+
+
+# ----------------------- Helpers -----------------------
+
+def _geocode_and_fetch(place: str) -> Dict:
+    geo = geocode_place(place)
     if geo is None:
         return {"error": "Location not found"}
 
-    # Fetch live weather
     weather = fetch_weather(geo["lat"], geo["lon"])
     if weather is None:
         return {"error": "Weather service unavailable"}
 
-    # Pass location into risk engine for alert lookup
     weather["location_name"] = geo["name"]
+    return {"geo": geo, "weather": weather}
+
+
+def _safe_batch_fetch(place: str) -> Dict:
+    # one failing location must not sink the whole batch
+    try:
+        fetched = _geocode_and_fetch(place)
+        if "error" not in fetched:
+            fetched["alert"] = get_alert_signal(fetched["weather"])
+        return fetched
+    except Exception as e:
+        return {"error": f"Upstream failure: {e.__class__.__name__}"}
+
+
+def _raise_for_error(payload: Dict) -> None:
+    """Pipeline error payload → HTTP error: unknown place 404, upstream timeout 504, else 502."""
+    if "error" not in payload:
+        return
+    if payload["error"] == "Location not found":
+        status = 404
+    else:
+        status = 504 if "timed out" in payload["error"] else 502
+    raise HTTPException(status_code=status, detail=payload["error"])
+
+
+def _stream_response(places, fmt: str) -> StreamingResponse:
+    async def ndjson():
+        async for result in stream_risk_pipeline(places):
+            yield json.dumps(result) + "\n"
+
+    async def sse():
+        count = 0
+        async for result in stream_risk_pipeline(places):
+            count += 1
+            yield f"event: result\ndata: {json.dumps(result)}\n\n"
+        yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+
+    if fmt == "sse":
+        return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+# column names that mark the first CSV row as a header, in pick order for the place column
+CSV_PLACE_COLUMNS = ("location", "place", "city", "name", "town")
+CSV_HEADER_WORDS = set(CSV_PLACE_COLUMNS) | {"country", "region", "state", "lat", "lon", "latitude", "longitude", "id"}
+
+
+def _csv_locations(upload: UploadFile):
+    """
+    Lazily yield the place column of an uploaded CSV: `location` (or
+    place/city/name/town) when the first row is a header, else the first
+    column. Blank cells are skipped.
+    """
+    lines = codecs.iterdecode(upload.file, "utf-8-sig")
+    reader = csv.reader(lines)
+    first = next(reader, None)
+    if first is None:
+        return
+    normalized = [h.strip().lower() for h in first]
+    col = 0
+    if CSV_HEADER_WORDS.intersection(normalized):
+        col = next((normalized.index(c) for c in CSV_PLACE_COLUMNS if c in normalized), 0)
+    elif first and first[0].strip():
+        # no header row — the first line is already a location
+        yield first[0].strip()
+    for row in reader:
+        if len(row) > col and row[col].strip():
+            yield row[col].strip()
+
+
+# ----------------------- API Routes -----------------------
+
+@app.post("/risk", response_model=RiskResponse, response_model_exclude_unset=True)
+async def risk(req: RiskRequest, timings: bool = False):
+    request_timings = start_request_timings()
+
+    # Watched places → latest pre-computed payload; everything else is computed live:
+    # Geocode → (weather ‖ ReliefWeb city ‖ ReliefWeb country ‖ GDACS) under one deadline
+    with timed("total"):
+        payload = get_watchlist().get(req.location) if WATCHLIST_ENABLED else None
+        if payload is None:
+            payload = await run_risk_pipeline(req.location)
+
+    _raise_for_error(payload)
+    get_suggest_index().record(req.location, payload["location"])
+    if timings or RESPONSE_TIMINGS:
+        payload["timings"] = request_timings
+    return payload
+
+
+@app.get("/risk/point", response_model=RiskResponse, response_model_exclude_unset=True)
+async def risk_point(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    timings: bool = False,
+):
+    request_timings = start_request_timings()
 
-    result = compute_risks(weather)
+    # no forward geocoding: snap to a known place nearby or score the point itself
+    with timed("total"):
+        payload = await run_point_pipeline(lat, lon)
 
+    # upstream failures only: a coordinate always "resolves"
+    _raise_for_error(payload)
+    if timings or RESPONSE_TIMINGS:
+        payload["timings"] = request_timings
+    return payload
+
+
+@app.post("/risk/points", response_model=BatchRiskResponse)
+async def risk_points(req: BatchPointRequest):
+    if len(req.points) > BATCH_MAX_LOCATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_LOCATIONS} points per batch",
+        )
+
+    # points sharing a place or weather cell collapse onto one run (single-flight + result cache)
+    limit = asyncio.Semaphore(STREAM_CONCURRENCY)
+
+    async def one(point: PointRequest) -> Dict:
+        async with limit:
+            try:
+                payload = await run_point_pipeline(point.lat, point.lon)
+            except Exception as e:
+                payload = {"error": f"Pipeline failure: {e.__class__.__name__}"}
+        if "error" in payload:
+            payload["point"] = {"lat": point.lat, "lon": point.lon}
+        return payload
+
+    results = await asyncio.gather(*(one(p) for p in req.points))
+    errors = sum(1 for r in results if "error" in r)
+    return {"results": results, "count": len(results), "errors": errors}
+
+
+@app.post("/risk/batch", response_model=BatchRiskResponse)
+def risk_batch(req: BatchRiskRequest):
+    if len(req.locations) > BATCH_MAX_LOCATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_LOCATIONS} locations per batch",
+        )
+
+    # Upstream lookups are I/O bound → fan out over a small thread pool
+    with ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS) as pool:
+        fetched = list(pool.map(_safe_batch_fetch, req.locations))
+
+    # One stacked feature matrix → one model call for every resolved location
+    ok = [i for i, f in enumerate(fetched) if "error" not in f]
+    scored = compute_risks_batch(
+        [fetched[i]["weather"] for i in ok],
+        alerts=[fetched[i]["alert"] for i in ok],
+    )
+
+    results: List[Dict] = [
+        {"query": place, "error": f["error"]} if "error" in f else None
+        for place, f in zip(req.locations, fetched)
+    ]
+    for i, result in zip(ok, scored):
+        payload = build_risk_payload(fetched[i]["geo"], fetched[i]["weather"], result)
+        record_result(payload, model_version())
+        payload["query"] = req.locations[i]
+        results[i] = payload
+
+    return {
+        "results": results,
+        "count": len(results),
+        "errors": len(req.locations) - len(ok),
+    }
+
+
+@app.get("/risk/history")
+def risk_history(
+    location: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Optional[str] = Query(None, pattern="^(hour|day)$"),
+    limit: int = Query(1000, ge=1, le=HISTORY_QUERY_LIMIT),
+):
+    """Stored /risk results for one place: a time series plus range aggregates."""
+    geo = geocode_place(location)  # override / geocode cache in the common case
+    if geo is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    key = location_key(geo["lat"], geo["lon"])
+    start_ts = start.timestamp() if start else None
+    end_ts = end.timestamp() if end else None
+    history = get_history()
     return {
-        "risks": result["risks"],
-        "alert": result["alert"],
-        "features": result["features"],
-        "ai_insight": result["ai_insight"],
         "location": geo,
-        "weather": {
-            "temp_c": weather["current_weather"].get("temperature"),
-            "wind_kmh": weather["current_weather"].get("windspeed"),
-            "recent_rain_mm": result["features"]["rain_last_1d"],
-            "last_update": weather["current_weather"].get("time"),
-        }
+        "bucket": bucket,
+        "bucket_seconds": BUCKETS.get(bucket),
+        "aggregate": history.aggregate(key, start_ts, end_ts),
+        "series": history.series(key, start_ts, end_ts, bucket=bucket, limit=limit),
     }
 
 
+@app.get("/places/suggest")
+async def places_suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(SUGGEST_DEFAULT_LIMIT, ge=1, le=SUGGEST_MAX_LIMIT),
+):
+    """Autocomplete: in-memory prefix index, no upstream calls."""
+    return {"query": q, "suggestions": get_suggest_index().suggest(q, limit)}
+
+
+@app.post("/risk/stream")
+async def risk_stream(req: BatchRiskRequest, format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    if len(req.locations) > STREAM_MAX_LOCATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {STREAM_MAX_LOCATIONS} locations per stream",
+        )
+    return _stream_response(req.locations, format)
+
+
+@app.post("/risk/stream/csv")
+async def risk_stream_csv(file: UploadFile = File(...), format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    # the upload is already spooled; one counting pass lets oversize files get
+    # the same 413 as /risk/stream instead of a silently truncated stream
+    def count_rows() -> int:
+        return sum(1 for _ in itertools.islice(_csv_locations(file), STREAM_MAX_LOCATIONS + 1))
+
+    if await run_in_threadpool(count_rows) > STREAM_MAX_LOCATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {STREAM_MAX_LOCATIONS} locations per stream",
+        )
+    file.file.seek(0)
+    return _stream_response(_csv_locations(file), format)
+
+
+@app.get("/tiles/meta")
+def tiles_meta():
+    meta = tiles.read_meta()
+    if meta is None:
+        raise HTTPException(status_code=404, detail="No risk tiles have been built")
+    return meta
+
+
+@app.get("/tiles/{z}/{x}/{y}.npy")
+def risk_tile(z: int, x: int, y: int):
+    if not tiles.valid_tile(z, x, y):
+        raise HTTPException(status_code=400, detail="Tile outside the grid")
+    path = tiles.tile_path(z, x, y)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Tile not built")
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "public, max-age=900"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def home():
-    return {"status": "Backend running - GDIS Active"}
+    return {
+        "status": "Backend running - GDIS Active",
+        "circuits": breaker_states(),
+        "watchlist": get_watchlist().status(),
+        "point_index": get_location_index().stats(),
+    }
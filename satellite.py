@@ -1,36 +1,17 @@
 """
-Satellite Intelligence Stub (Upgrade Level 3 Ready)
---------------------------------------------------
-This file simulates satellite-based flood indicators.
-In future it can connect to:
+Satellite Intelligence (gridded rasters)
+----------------------------------------
+Standalone entry point for the raster-backed flood indicators. The
+implementation lives in backend/core/satellite.py; the API serves it as
+the `satellite` block of every /risk payload.
 
-🌧 NASA GPM IMERG (Global Precipitation Measurement)
-🛰 NOAA GOES / JPSS flood mapping
-🌊 ESA Sentinel SAR – surface water detection
+Requires backend/ on the import path, e.g.
 
-For now, returns a placeholder based on random + features.
-"""
-
-from typing import Dict, Any
-import random
-
-def get_satellite_flood_indicator(lat: float, lon: float) -> Dict[str, Any]:
-    """
-    Return satellite-based flood probability (stub).
-    Later this will be replaced with NASA / NOAA data pipelines.
-    """
+    PYTHONPATH=backend python -c "import satellite; print(satellite.get_satellite_flood_indicator(9.6, 76.5))"
 
-    # 🚩 Placeholder logic — controlled randomness
-    simulated_prob = random.uniform(0.0, 0.4)  # stays low unless real NASA added
-
-    level = (
-        "High" if simulated_prob > 0.75 else
-        "Medium" if simulated_prob > 0.40 else
-        "Low"
-    )
-
-    return {
-        "sat_prob": round(simulated_prob, 3),
-        "sat_level": level,
-        "source": "Satellite-Stub (NASA-GPM-ready)"
-    }
+This module does not modify sys.path itself.
+"""
+try:
+    from core.satellite import get_satellite_flood_indicator, get_satellite_flood_indicators  # noqa: F401
+except ImportError as e:
+    raise ImportError("satellite.py re-exports backend/core/satellite.py: run with backend/ on PYTHONPATH") from e
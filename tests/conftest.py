@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# core/* reads its paths from the environment at import time: point every
+# on-disk store at a scratch directory before any test imports them
+_SCRATCH = Path(tempfile.mkdtemp(prefix="gdis-tests-"))
+os.environ.setdefault("GEOCODE_CACHE_PATH", str(_SCRATCH / "geocode.sqlite3"))
+os.environ.setdefault("HISTORY_DB_PATH", str(_SCRATCH / "history.sqlite3"))
+os.environ.setdefault("GAZETTEER_DIR", str(_SCRATCH / "gazetteer"))
+os.environ.setdefault("RISK_TILE_DIR", str(_SCRATCH / "tiles"))
+os.environ.setdefault("RASTER_DIR", str(_SCRATCH / "rasters"))
+os.environ.setdefault("WATCHLIST_ENABLED", "0")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT))  # main.py
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    # no context manager: startup hooks (index warming, preload) stay off
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("error, status", [
+    ("Location not found", 404),
+    ("Geocoding timed out", 504),
+    ("Weather service timed out", 504),
+    ("Weather service unavailable", 502),
+])
+def test_pipeline_errors_map_to_http_status(client, monkeypatch, error, status):
+    async def pipeline(*args):
+        return {"error": error}
+
+    monkeypatch.setattr(main, "run_risk_pipeline", pipeline)
+    monkeypatch.setattr(main, "run_point_pipeline", pipeline)
+
+    resp = client.post("/risk", json={"location": "Atlantis"})
+    assert resp.status_code == status
+    assert resp.json()["detail"] == error
+    if error != "Location not found":
+        assert client.get("/risk/point", params={"lat": 9.6, "lon": 76.5}).status_code == status
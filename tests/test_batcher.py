@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+import pytest
+
+from core.batcher import MicroBatcher
+
+
+def _sum_rows(X):
+    return X.sum(axis=1).tolist()
+
+
+def test_rows_resolve_to_their_own_prediction():
+    batcher = MicroBatcher("test", _sum_rows, max_batch=4, max_wait=0.01)
+    try:
+        futures = [batcher.submit(np.array([float(i), 1.0])) for i in range(10)]
+        assert [f.result(5) for f in futures] == [i + 1.0 for i in range(10)]
+    finally:
+        batcher.stop()
+
+
+def _blocked_batcher(predict):
+    """A batcher whose first predict call waits for the returned event."""
+    entered, release = threading.Event(), threading.Event()
+    state = {"first": True}
+
+    def blocking(X):
+        if state["first"]:
+            state["first"] = False
+            entered.set()
+            release.wait(5)
+        return predict(X)
+
+    return MicroBatcher("test", blocking, max_batch=8, max_wait=0.0), entered, release
+
+
+def test_cancelled_futures_are_skipped():
+    batcher, entered, release = _blocked_batcher(_sum_rows)
+    try:
+        head = batcher.submit(np.array([0.0]))
+        assert entered.wait(5)
+        # queued behind the running batch; the middle caller gives up
+        queued = [batcher.submit(np.array([float(i)])) for i in range(1, 4)]
+        assert queued[1].cancel()
+        release.set()
+
+        assert head.result(5) == 0.0
+        assert queued[0].result(5) == 1.0
+        assert queued[2].result(5) == 3.0
+        assert queued[1].cancelled()
+        # dispatcher survived the cancellation
+        assert batcher.submit(np.array([5.0])).result(5) == 5.0
+    finally:
+        release.set()
+        batcher.stop()
+
+
+def test_failing_batch_fails_its_callers_only():
+    def predict(X):
+        if (X < 0).any():
+            raise ValueError("bad row")
+        return _sum_rows(X)
+
+    batcher = MicroBatcher("test", predict, max_batch=8, max_wait=0.0)
+    try:
+        with pytest.raises(ValueError):
+            batcher.submit(np.array([-1.0])).result(5)
+        assert batcher.submit(np.array([2.0])).result(5) == 2.0
+    finally:
+        batcher.stop()
+
+
+def test_stop_scores_queued_rows():
+    batcher, entered, release = _blocked_batcher(_sum_rows)
+    head = batcher.submit(np.array([1.0]))
+    assert entered.wait(5)
+    queued = batcher.submit(np.array([2.0]))
+    release.set()
+    batcher.stop()
+    assert head.result(5) == 1.0
+    assert queued.result(5) == 2.0
@@ -0,0 +1,47 @@
+from core.event_index import EventIndex, normalize_text, parse_gdacs_geometry
+
+EVENTS = [
+    {"name": "Flood in Indiana", "country": "United States", "iso3": "USA", "point": (39.8, -86.1)},
+    {"name": "Flood in India", "country": "India, Bangladesh", "iso3": "IND, BGD", "point": (26.1, 91.7),
+     "bbox": (24.0, 88.0, 28.0, 95.0)},
+    {"name": "Flood in São Paulo", "country": "", "point": None},
+    {"name": "Flood in Fiji", "country": "Fiji", "bbox": (-20.0, 177.0, -15.0, -178.0)},
+]
+
+
+def test_place_tokens_match_whole_words():
+    index = EventIndex(EVENTS)
+    assert index.match_place("India") == {1}
+    assert index.match_place("Indiana") == {0}
+    assert index.match_place("Ind") == set()
+    assert index.match_place("sao paulo") == {2}
+
+
+def test_country_by_name_and_iso3():
+    index = EventIndex(EVENTS)
+    assert index.match_country("India") == {1}
+    assert index.match_country("bangladesh") == {1}
+    assert index.match_country("USA") == {0}
+    # events without a country match on their name
+    assert index.match_country("Paulo") == {2}
+
+
+def test_geographic_matches():
+    index = EventIndex(EVENTS)
+    assert index.events_near(26.0, 91.5, 50) == {1}
+    assert index.events_near(0.0, 0.0, 500) == set()
+    assert index.events_covering(25.0, 90.0) == {1}
+    # bbox crossing the antimeridian
+    assert index.events_covering(-17.0, 179.5) == {3}
+    assert index.events_covering(-17.0, -179.5) == {3}
+    assert index.events_covering(-17.0, 170.0) == set()
+
+
+def test_normalize_and_geometry():
+    assert normalize_text("São-Paulo!") == "sao paulo"
+    point, bbox = parse_gdacs_geometry({
+        "geometry": {"type": "Point", "coordinates": [91.7, 26.1]},
+        "bbox": [88.0, 24.0, 95.0, 28.0],
+    })
+    assert point == (26.1, 91.7)
+    assert bbox == (24.0, 88.0, 28.0, 95.0)
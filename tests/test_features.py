@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from core.features import FEATURE_NAMES, RAIN_WINDOWS, feature_matrix
+
+
+def _weather(rain, now_index, humidity=None, gusts=None, windspeed=5.0):
+    start = datetime(2024, 7, 1)
+    times = [(start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(len(rain))]
+    hourly = {"time": times, "precipitation": rain}
+    if humidity is not None:
+        hourly["relativehumidity_2m"] = humidity
+    if gusts is not None:
+        hourly["windgusts_10m"] = gusts
+    return {
+        "hourly": hourly,
+        "current_weather": {"time": times[now_index][:13] + ":15", "windspeed": windspeed},
+    }
+
+
+def _naive_sum(rain, end, hours):
+    window = rain[max(end + 1 - hours, 0):end + 1]
+    return sum(v for v in window if v is not None)
+
+
+def test_rain_windows_match_naive_sums():
+    rng = np.random.default_rng(3)
+    long_rain = [round(float(v), 1) for v in rng.gamma(0.5, 2.0, size=240)]
+    long_rain[200] = None
+    short_rain = [1.0] * 50
+    weather = [_weather(long_rain, 210), _weather(short_rain, 49), _weather(long_rain, 30)]
+
+    names, matrix = feature_matrix(weather)
+    assert names == FEATURE_NAMES
+    assert matrix.shape == (3, len(FEATURE_NAMES))
+    for row, (rain, end) in enumerate([(long_rain, 210), (short_rain, 49), (long_rain, 30)]):
+        for name, hours in RAIN_WINDOWS.items():
+            expected = _naive_sum(rain, end, hours)
+            assert matrix[row, names.index(name)] == pytest.approx(expected, rel=1e-5, abs=1e-4)
+
+
+def test_stats_windows_and_defaults():
+    rain = [0.0] * 48
+    rain[40] = 7.5
+    rain[10] = 99.0  # outside the 24h window ending at hour 47
+    humidity = [50.0] * 24 + [80.0] * 23 + [None]
+    gusts = [10.0] * 47 + [33.0]
+    names, matrix = feature_matrix([_weather(rain, 47, humidity, gusts), _weather([0.0] * 5, 4)], elevations=[12.0, 3.0])
+    row = dict(zip(names, matrix[0]))
+
+    assert row["rain_max_1h_24h"] == pytest.approx(7.5)
+    # current humidity is missing → the 24h mean stands in
+    assert row["humidity_mean_24h"] == pytest.approx(80.0)
+    assert row["humidity"] == pytest.approx(80.0)
+    assert row["gust_max_24h"] == pytest.approx(33.0)
+    assert row["elevation"] == pytest.approx(12.0)
+
+    empty = dict(zip(names, matrix[1]))
+    assert empty["humidity"] == pytest.approx(60.0)
+    assert empty["gust_max_24h"] == 0.0
+
+
+def test_empty_input():
+    names, matrix = feature_matrix([])
+    assert matrix.shape == (0, len(names))
+
+
+def test_series_longer_than_precipitation_are_truncated():
+    rain = [1.0] * 30
+    humidity = [70.0] * 30 + [10.0] * 20
+    gusts = [20.0] * 29 + [40.0] + [90.0] * 20
+    names, matrix = feature_matrix([_weather(rain, 29, humidity, gusts)])
+    row = dict(zip(names, matrix[0]))
+    assert row["rain_last_1d"] == pytest.approx(24.0)
+    assert row["humidity"] == pytest.approx(70.0)
+    assert row["gust_max_24h"] == pytest.approx(40.0)
@@ -0,0 +1,45 @@
+import pytest
+
+from core.gazetteer import Gazetteer, build_gazetteer
+
+PLACES = [
+    ("Paris", 48.8566, 2.3522, "FR", "France", 2_100_000, ["Paris"]),
+    ("Paris", 33.6609, -95.5555, "US", "United States", 25_000, ["Paris"]),
+    ("Parma", 44.8015, 10.3279, "IT", "Italy", 195_000, ["Parma"]),
+    ("São Paulo", -23.5505, -46.6333, "BR", "Brazil", 12_300_000, ["São Paulo", "Sao Paulo"]),
+    ("Kochi", 9.9312, 76.2673, "IN", "India", 600_000, ["Kochi", "Cochin"]),
+]
+
+
+@pytest.fixture(scope="module")
+def gazetteer(tmp_path_factory):
+    root = tmp_path_factory.mktemp("gazetteer")
+    meta = build_gazetteer(PLACES, root, source="test")
+    assert meta["places"] == len(PLACES)
+    return Gazetteer(root)
+
+
+def test_lookup_prefers_the_most_populous_match(gazetteer):
+    assert gazetteer.lookup("paris") == {"name": "Paris", "country": "France", "lat": 48.8566, "lon": 2.3522}
+
+
+def test_lookup_with_country(gazetteer):
+    assert gazetteer.lookup("Paris, United States")["country"] == "United States"
+    assert gazetteer.lookup("Paris, US")["country"] == "United States"
+    assert gazetteer.lookup("Paris, Italy") is None
+
+
+def test_lookup_normalizes_and_uses_alternate_names(gazetteer):
+    assert gazetteer.lookup("sao-paulo")["name"] == "São Paulo"
+    assert gazetteer.lookup("COCHIN")["name"] == "Kochi"
+    assert gazetteer.lookup("Atlantis") is None
+    assert gazetteer.lookup("  ") is None
+
+
+def test_prefix_search_by_population(gazetteer):
+    assert [(p["name"], p["country"]) for p in gazetteer.prefix_search("par")] == [
+        ("Paris", "France"), ("Parma", "Italy"), ("Paris", "United States"),
+    ]
+    assert len(gazetteer.prefix_search("par", limit=1)) == 1
+    assert gazetteer.prefix_search("parisx") == []
+    assert gazetteer.prefix_search("") == []
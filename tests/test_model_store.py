@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from core.model_store import atomic_write
+
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def test_atomic_write_uses_umask_mode(tmp_path):
+    path = tmp_path / "sub" / "artefact.json"
+    atomic_write(path, lambda tmp: tmp.write_text("{}"))
+    assert path.read_text() == "{}"
+    assert path.stat().st_mode & 0o777 == 0o666 & ~_umask()
+
+
+def test_atomic_write_failure_leaves_nothing_behind(tmp_path):
+    path = tmp_path / "artefact.json"
+    path.write_text("old")
+
+    def fail(tmp):
+        tmp.write_text("partial")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, fail)
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["artefact.json"]
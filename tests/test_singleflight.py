@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+def _run_concurrently(group, fn, n=5):
+    results, errors = [None] * n, [None] * n
+
+    def call(i):
+        try:
+            results[i] = group.do("key", fn)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_result():
+    group = SingleFlight("test")
+    calls, release = [], threading.Event()
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42, "nested": {"hits": []}}
+
+    threads, results, errors = _run_concurrently(group, fn)
+    time.sleep(0.2)  # followers are parked on the leader's call
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert errors == [None] * 5
+    assert all(r == {"value": 42, "nested": {"hits": []}} for r in results)
+    # every caller owns its copy, nested dicts included
+    results[0]["nested"]["hits"].append("x")
+    assert results[1]["nested"]["hits"] == []
+
+
+def test_concurrent_calls_share_the_exception():
+    group = SingleFlight("test")
+    calls, release = [], threading.Event()
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    threads, results, errors = _run_concurrently(group, fn)
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_finished_call_is_not_cached():
+    group = SingleFlight("test")
+    calls = []
+    group.do("key", lambda: calls.append(1))
+    group.do("key", lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_async_calls_share_result_and_exception():
+    group = SingleFlight("test")
+    calls = []
+
+    async def ok():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def main():
+        results = await asyncio.gather(*(group.ado("ok", ok) for _ in range(5)))
+        errors = await asyncio.gather(*(group.ado("fail", fail) for _ in range(5)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(main())
+    assert len(calls) == 2
+    assert results == [{"value": 1}] * 5
+    assert results[0] is not results[1]
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_one_caller_timing_out_does_not_cancel_the_shared_call():
+    group = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def main():
+        impatient = asyncio.wait_for(group.ado("k", slow), 0.01)
+        patient = group.ado("k", slow)
+        return await asyncio.gather(impatient, patient, return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, asyncio.TimeoutError)
+    assert second == "done"
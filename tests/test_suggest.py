@@ -0,0 +1,55 @@
+import pytest
+
+import core.suggest as suggest
+from core.gazetteer import Gazetteer, build_gazetteer
+
+
+class _GeocodeCache:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def positive_entries(self, limit=None):
+        return list(self.entries)[:limit]
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    build_gazetteer([
+        ("Kottarakkara", 9.0, 76.77, "IN", "India", 30_000, ["Kottarakkara"]),
+        ("Kottayam", 9.59, 76.52, "IN", "India", 170_000, ["Kottayam"]),
+        ("Kota", 25.18, 75.83, "IN", "India", 1_000_000, ["Kota"]),
+    ], tmp_path)
+    monkeypatch.setattr(suggest, "get_gazetteer", lambda: Gazetteer(tmp_path))
+    monkeypatch.setattr(suggest, "get_geocode_cache", lambda: _GeocodeCache([
+        ("kothamangalam", {"name": "Kothamangalam", "country": "India", "lat": 10.06, "lon": 76.63}),
+    ]))
+    return suggest.SuggestIndex()
+
+
+def test_local_and_gazetteer_places_are_merged(index):
+    results = index.suggest("kot")
+    names = [s["name"] for s in results]
+    # Kottayam is both an override and a gazetteer place: listed once
+    assert names.count("Kottayam") == 1
+    assert set(names) == {"Kota", "Kottayam", "Kottarakkara", "Kothamangalam"}
+    by_name = {s["name"]: s for s in results}
+    assert by_name["Kottayam"]["query"] == "kottayam"
+    assert by_name["Kottayam"]["population"] == 170_000
+    assert by_name["Kota"]["query"] == "Kota, India"
+    assert by_name["Kothamangalam"]["query"] == "kothamangalam"
+
+
+def test_ranked_by_hits_then_population(index):
+    assert [s["name"] for s in index.suggest("kot")][:2] == ["Kota", "Kottayam"]
+    index.record("Kothamangalam ", {"name": "Kothamangalam", "country": "India", "lat": 10.06, "lon": 76.63})
+    results = index.suggest("kot", limit=2)
+    assert [s["name"] for s in results] == ["Kothamangalam", "Kota"]
+    assert results[0]["hits"] == 1
+
+
+def test_display_name_and_typed_alias(index):
+    # override "trivandrum" → Thiruvananthapuram is reachable by both
+    assert index.suggest("thiruv")[0]["query"] == "trivandrum"
+    assert index.suggest("trivan")[0]["name"] == "Thiruvananthapuram"
+    assert index.suggest("  ") == []
+    assert index.suggest("zzz") == []
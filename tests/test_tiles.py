@@ -0,0 +1,39 @@
+import json
+
+from core import tiles
+
+
+def test_meta_accumulates_builds(tmp_path):
+    tiles.write_meta(tmp_path, bbox=tiles.REGIONS["kerala"], zoom=6)
+    tiles.write_meta(tmp_path, bbox=tiles.REGIONS["sri-lanka"], zoom=6)
+    tiles.write_meta(tmp_path, bbox=tiles.REGIONS["kerala"], zoom=7)
+    tiles.write_meta(tmp_path, bbox=tiles.REGIONS["kerala"], zoom=6)  # rebuild
+
+    meta = tiles.read_meta(tmp_path)
+    assert meta["zooms"] == [6, 7]
+    assert sorted((b["zoom"], tuple(b["bbox"])) for b in meta["builds"]) == [
+        (6, tiles.REGIONS["kerala"]), (6, tiles.REGIONS["sri-lanka"]), (7, tiles.REGIONS["kerala"]),
+    ]
+    assert meta["bbox"] == [74.8, 5.8, 82.0, 12.9]
+    assert meta["bands"] == list(tiles.BANDS)
+
+
+def test_meta_from_single_build_layout_is_kept(tmp_path):
+    (tmp_path / "meta.json").write_text(json.dumps({"bbox": [74.8, 8.1, 77.5, 12.9], "zoom": 5}))
+    tiles.write_meta(tmp_path, bbox=tiles.REGIONS["india"], zoom=4)
+    assert tiles.read_meta(tmp_path)["zooms"] == [4, 5]
+
+
+def test_compute_tile_uses_the_given_snapshot(monkeypatch):
+    import core.alerts as alerts
+    import core.geo as geo
+    from core.event_index import EventIndex
+
+    def no_refresher():
+        raise AssertionError("batch tiles must not start the GDACS refresher")
+
+    monkeypatch.setattr(alerts._gdacs_feed, "start", no_refresher)
+    monkeypatch.setattr(geo, "fetch_weather_many", lambda points: [None] * len(points))
+    tile = tiles.compute_tile(5, 40, 10, size=4, gdacs=EventIndex([]))
+    assert tile.shape == (len(tiles.BANDS), 4, 4)
+    assert (tile == tiles.NODATA).all()
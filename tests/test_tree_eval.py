@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from core.tree_eval import CompiledForest, export_booster
+
+xgb = pytest.importorskip("xgboost")
+
+
+@pytest.fixture(scope="module")
+def booster():
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(2000, 5)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] > 0).astype(int)
+    # missing values in training: splits learn a default direction for NaN
+    X[rng.random(X.shape) < 0.15] = np.nan
+    y[np.isnan(X[:, 0])] = 1
+    dtrain = xgb.DMatrix(X, label=y, feature_names=[f"f{i}" for i in range(5)])
+    params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.3, "tree_method": "hist", "seed": 0}
+    return xgb.train(params, dtrain, num_boost_round=30)
+
+
+def _rows() -> np.ndarray:
+    rng = np.random.default_rng(11)
+    X = rng.normal(size=(500, 5)).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    X[:10] = np.nan           # every split takes its default branch
+    X[10:20, 0] = np.nan      # default branch on the root feature only
+    return X
+
+
+def test_export_matches_xgboost(booster):
+    forest = export_booster(booster)
+    X = _rows()
+    expected = booster.predict(xgb.DMatrix(X, feature_names=booster.feature_names))
+    assert forest.n_trees == 30
+    assert forest.default_left.any() and not forest.default_left.all()
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_single_row_and_roundtrip(booster, tmp_path):
+    forest = export_booster(booster)
+    path = tmp_path / "forest.npz"
+    forest.save(path)
+    loaded = CompiledForest.load(path)
+
+    X = _rows()
+    expected = booster.predict(xgb.DMatrix(X[:1], feature_names=booster.feature_names))
+    np.testing.assert_allclose(loaded.predict(X[0]), expected, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X))
+    assert loaded.feature_names == forest.feature_names
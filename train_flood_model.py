@@ -1,81 +1,397 @@
 # =============================
 # Flood Risk XGBoost Training
 # =============================
+# Out-of-core: the CSV is streamed in chunks, split into train/validation/test
+# per chunk and cached as .npy chunk files, so later runs skip CSV parsing
+# entirely. Chunks feed xgboost through a DataIter into a QuantileDMatrix
+# (or an external-memory matrix with --memory external), trained with
+# `hist` on all cores. Runs headless: plots are saved, not shown.
+#
+#   python train_flood_model.py --data data/rainfall_flood_dataset.csv
+#   python train_flood_model.py --tune --trials 40 --workers 4
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
 import numpy as np
+import pandas as pd
 import xgboost as xgb
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import joblib
+import matplotlib
+matplotlib.use("Agg")  # headless: never open a window
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
-
-# ------------------------------
-# Load Data
-# ------------------------------
-dataset_path = "data/rainfall_flood_dataset.csv"   # Change if different name
-df = pd.read_csv(dataset_path)
+from sklearn.metrics import confusion_matrix
 
-print("Dataset Loaded:", df.shape)
-print(df.head())
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+from core.model_store import FOREST_NAME, atomic_write, save_native  # noqa: E402
+from core.tree_eval import export_booster  # noqa: E402
 
 # ------------------------------
 # Feature Selection
 # ------------------------------
-feature_cols = ["rain_last_1d", "rain_last_3d", "rain_last_7d", "humidity", "wind_speed", "elevation"]
-X = df[feature_cols]
-y = df["flood_risk"]  # 0 = Low, 1 = Medium/High
+FEATURE_COLS = ["rain_last_1d", "rain_last_3d", "rain_last_7d", "humidity", "wind_speed", "elevation"]
+LABEL_COL = "flood_risk"  # 0 = Low, 1 = Medium/High
+
+DEFAULT_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "logloss",
+    "tree_method": "hist",
+    "max_depth": 6,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+}
+DEFAULT_ROUNDS = 300
+
+# Search space for --tune (XGBClassifier names; n_estimators = max boosting rounds)
+SEARCH_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8, 10],
+    "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2],
+    "subsample": [0.6, 0.7, 0.8, 0.9, 1.0],
+    "n_estimators": [200, 400, 800],
+}
+EARLY_STOPPING_ROUNDS = 30
 
-# ------------------------------
-# Train Test Split
-# ------------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
 
 # ------------------------------
-# Train XGBoost Model
+# Chunk Cache (binary, between runs)
 # ------------------------------
-model = xgb.XGBClassifier(
-    n_estimators=300,
-    max_depth=6,
-    learning_rate=0.05,
-    subsample=0.8,
-    colsample_bytree=0.8,
-    eval_metric="logloss"
-)
-
-print("Training Model...")
-model.fit(X_train, y_train)
+def _fingerprint(path: Path, chunksize: int, test_size: float, val_size: float, seed: int) -> str:
+    stat = path.stat()
+    key = json.dumps([str(path.resolve()), stat.st_size, stat.st_mtime_ns, chunksize,
+                      test_size, val_size, seed, FEATURE_COLS, LABEL_COL])
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def build_chunk_cache(data_path: Path, cache_root: Path, chunksize: int,
+                      test_size: float, val_size: float, seed: int) -> Path:
+    """
+    Stream the CSV once into float32 .npy chunks (train_/val_/test_ per chunk).
+    `val` drives early stopping and model selection; `test` is held out for
+    the final score only. The manifest is written last, so an interrupted
+    run is simply redone.
+    """
+    if test_size + val_size >= 1.0:
+        raise ValueError(f"--test-size + --val-size must be < 1 (got {test_size} + {val_size})")
+    cache_dir = cache_root / _fingerprint(data_path, chunksize, test_size, val_size, seed)
+    manifest_path = cache_dir / "manifest.json"
+    if manifest_path.exists():
+        print(f"♻ Using cached chunks → {cache_dir}")
+        return cache_dir
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    chunks: Dict[str, List[str]] = {"train": [], "val": [], "test": []}
+    rows = {"train": 0, "val": 0, "test": 0}
+
+    reader = pd.read_csv(
+        data_path,
+        usecols=FEATURE_COLS + [LABEL_COL],
+        dtype={c: np.float32 for c in FEATURE_COLS + [LABEL_COL]},
+        chunksize=chunksize,
+    )
+    for i, df in enumerate(reader):
+        X = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+        y = df[LABEL_COL].to_numpy(dtype=np.float32)
+        draw = rng.random(len(df))
+        is_test = draw < test_size
+        is_val = (draw >= test_size) & (draw < test_size + val_size)
+
+        for split, mask in (("train", ~(is_test | is_val)), ("val", is_val), ("test", is_test)):
+            if not mask.any():
+                continue
+            name = f"{split}_{i:05d}"
+            np.save(cache_dir / f"{name}_X.npy", X[mask])
+            np.save(cache_dir / f"{name}_y.npy", y[mask])
+            chunks[split].append(name)
+            rows[split] += int(mask.sum())
+        print(f"  chunk {i}: {len(df)} rows")
+
+    manifest = {"features": FEATURE_COLS, "chunks": chunks, "rows": rows}
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    print(f"Dataset cached: {rows['train']} train / {rows['val']} validation / {rows['test']} test rows → {cache_dir}")
+    return cache_dir
+
+
+def load_manifest(cache_dir: Path) -> Dict:
+    return json.loads((cache_dir / "manifest.json").read_text())
+
+
+class ChunkIter(xgb.DataIter):
+    """Feeds cached chunks to xgboost one at a time (memory-mapped)."""
+
+    def __init__(self, cache_dir: Path, names: List[str], cache_prefix: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self._names = names
+        self._it = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._it == len(self._names):
+            return False
+        name = self._names[self._it]
+        X = np.load(self._cache_dir / f"{name}_X.npy", mmap_mode="r")
+        y = np.load(self._cache_dir / f"{name}_y.npy", mmap_mode="r")
+        input_data(data=np.asarray(X), label=np.asarray(y), feature_names=FEATURE_COLS)
+        self._it += 1
+        return True
+
+    def reset(self) -> None:
+        self._it = 0
+
+
+def iter_chunks(cache_dir: Path, names: List[str]):
+    for name in names:
+        yield (np.load(cache_dir / f"{name}_X.npy", mmap_mode="r"),
+               np.load(cache_dir / f"{name}_y.npy", mmap_mode="r"))
+
+
+def build_matrices(cache_dir: Path, memory: str, nthread: int,
+                   max_bin: int = 256) -> Tuple[xgb.DMatrix, xgb.DMatrix]:
+    manifest = load_manifest(cache_dir)
+    train_names, val_names = manifest["chunks"]["train"], manifest["chunks"]["val"]
+
+    if memory == "external":
+        # pages spill to disk next to the chunk cache; one prefix per process,
+        # since tuning workers each build their own pages concurrently
+        prefix = str(cache_dir / f"xgb-extmem-{os.getpid()}")
+        train_it = ChunkIter(cache_dir, train_names, cache_prefix=prefix)
+        if hasattr(xgb, "ExtMemQuantileDMatrix"):
+            dtrain = xgb.ExtMemQuantileDMatrix(train_it, max_bin=max_bin, nthread=nthread)
+        else:
+            dtrain = xgb.DMatrix(train_it, nthread=nthread)
+    else:
+        dtrain = xgb.QuantileDMatrix(ChunkIter(cache_dir, train_names), max_bin=max_bin, nthread=nthread)
+
+    dval = xgb.QuantileDMatrix(ChunkIter(cache_dir, val_names), ref=dtrain, nthread=nthread)
+    return dtrain, dval
+
 
 # ------------------------------
-# Evaluation
+# Evaluation (streamed over the held-out test chunks)
 # ------------------------------
-preds = model.predict(X_test)
-acc = accuracy_score(y_test, preds)
+def evaluate(booster: xgb.Booster, cache_dir: Path, split: str = "test") -> Tuple[float, float, np.ndarray]:
+    """(accuracy, logloss, confusion matrix) on `split`; never used for model selection."""
+    names = load_manifest(cache_dir)["chunks"][split]
+    cm = np.zeros((2, 2), dtype=np.int64)
+    loss_sum, n = 0.0, 0
+    for X, y in iter_chunks(cache_dir, names):
+        y = np.asarray(y).astype(int)
+        prob = np.clip(booster.inplace_predict(np.asarray(X)), 1e-7, 1 - 1e-7)
+        cm += confusion_matrix(y, (prob >= 0.5).astype(int), labels=[0, 1])
+        loss_sum += float(-(y * np.log(prob) + (1 - y) * np.log(1 - prob)).sum())
+        n += len(y)
+    acc = float(np.trace(cm)) / max(int(cm.sum()), 1)
+    return acc, loss_sum / max(n, 1), cm
+
+
+def classification_summary(cm: np.ndarray) -> str:
+    lines = [f"{'':>8}{'precision':>11}{'recall':>9}{'f1':>8}{'support':>9}"]
+    for k in (0, 1):
+        tp = cm[k, k]
+        precision = tp / max(cm[:, k].sum(), 1)
+        recall = tp / max(cm[k, :].sum(), 1)
+        f1 = 2 * precision * recall / max(precision + recall, 1e-12)
+        lines.append(f"{k:>8}{precision:>11.3f}{recall:>9.3f}{f1:>8.3f}{cm[k, :].sum():>9}")
+    return "\n".join(lines)
+
+
+def save_confusion_matrix(cm: np.ndarray, plots_dir: Path, title: str = "Confusion Matrix - Flood Risk") -> Path:
+    plots_dir.mkdir(parents=True, exist_ok=True)
+    fig = plt.figure()
+    sns.heatmap(cm, annot=True, cmap="Blues", fmt="g")
+    plt.title(title)
+    path = plots_dir / "confusion_matrix.png"
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+    return path
 
-print("Accuracy:", acc)
-print("\nClassification Report:\n", classification_report(y_test, preds))
 
 # ------------------------------
-# Confusion Matrix
+# Export Model
 # ------------------------------
-cm = confusion_matrix(y_test, preds)
-sns.heatmap(cm, annot=True, cmap="Blues", fmt="g")
-plt.title("Confusion Matrix - Flood Risk")
-plt.show()
+def export_model(booster: xgb.Booster, out_dir: Path, extra: Optional[Dict] = None) -> Path:
+    # Native UBJSON booster + {"model", "features"} manifest — loads much faster
+    # than the old joblib pickle and needs no sklearn at serving time.
+    manifest = save_native(booster, FEATURE_COLS, out_dir, extra=extra)
+    forest = export_booster(booster, FEATURE_COLS)
+    atomic_write(out_dir / FOREST_NAME, lambda tmp: forest.save(tmp))
+    return manifest
+
 
 # ------------------------------
-# Export Model
+# Hyperparameter Search
 # ------------------------------
-artifact = {
-    "model": model,
-    "features": feature_cols
-}
+def sample_trials(n: int, seed: int) -> List[Dict]:
+    """Deterministic for a given seed, so a resumed search replays the same trials."""
+    rng = random.Random(seed)
+    return [
+        {"trial": i, **{name: rng.choice(values) for name, values in SEARCH_SPACE.items()}}
+        for i in range(n)
+    ]
+
+
+def load_finished_trials(log_path: Path) -> Dict[int, Dict]:
+    finished: Dict[int, Dict] = {}
+    if not log_path.exists():
+        return finished
+    for line in log_path.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # partially written last line from an interrupted run
+        finished[record["trial"]] = record
+    # drop any torn line so appended records start on a fresh line
+    log_path.write_text("".join(json.dumps(r) + "\n" for r in finished.values()))
+    return finished
+
+
+# one (dtrain, dval) pair per worker process, built once in the initializer
+_worker_state: Dict = {}
+
+
+def _init_worker(cache_dir: str, memory: str, nthread: int) -> None:
+    _worker_state["nthread"] = nthread
+    _worker_state["dtrain"], _worker_state["dval"] = build_matrices(Path(cache_dir), memory, nthread)
+
+
+def run_trial(trial: Dict, seed: int, models_dir: str) -> Dict:
+    params = dict(
+        DEFAULT_PARAMS,
+        max_depth=trial["max_depth"],
+        learning_rate=trial["learning_rate"],
+        subsample=trial["subsample"],
+        nthread=_worker_state["nthread"],
+        seed=seed,
+    )
+    start = time.time()
+    booster = xgb.train(
+        params,
+        _worker_state["dtrain"],
+        num_boost_round=trial["n_estimators"],
+        evals=[(_worker_state["dval"], "validation")],
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        verbose_eval=False,
+    )
+    model_path = Path(models_dir) / f"trial_{trial['trial']:04d}.ubj"
+    booster[: booster.best_iteration + 1].save_model(model_path)
+    return {
+        **trial,
+        "params": params,
+        "logloss": float(booster.best_score),
+        "best_iteration": int(booster.best_iteration),
+        "model_file": str(model_path),
+        "seconds": round(time.time() - start, 2),
+    }
+
+
+def tune(args: argparse.Namespace, cache_dir: Path) -> Dict:
+    tune_dir = cache_dir / "tuning"
+    models_dir = tune_dir / "models"
+    models_dir.mkdir(parents=True, exist_ok=True)
+    log_path = Path(args.trials_log) if args.trials_log else tune_dir / "trials.jsonl"
+
+    finished = load_finished_trials(log_path)
+    pending = [t for t in sample_trials(args.trials, args.seed) if t["trial"] not in finished]
+    print(f"🔎 Tuning: {len(finished)} trials done, {len(pending)} to run on {args.workers} workers")
+
+    # split cores between workers so trials don't oversubscribe the CPU
+    nthread = max(1, args.nthread // args.workers)
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(str(cache_dir), args.memory, nthread),
+        ) as pool, log_path.open("a") as log:
+            futures = [pool.submit(run_trial, t, args.seed, str(models_dir)) for t in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                log.write(json.dumps(record) + "\n")
+                log.flush()  # checkpoint: a crash after this line keeps the trial
+                finished[record["trial"]] = record
+                print(f"  trial {record['trial']:>3}: logloss={record['logloss']:.5f} "
+                      f"depth={record['max_depth']} lr={record['learning_rate']} "
+                      f"subsample={record['subsample']} rounds={record['best_iteration'] + 1} "
+                      f"({record['seconds']}s)")
+
+    trials = [finished[t["trial"]] for t in sample_trials(args.trials, args.seed) if t["trial"] in finished]
+    best = min(trials, key=lambda r: r["logloss"])
+    print(f"🏆 Best trial {best['trial']}: validation logloss={best['logloss']:.5f} (test score below)")
+    return best
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the flood-risk XGBoost model")
+    parser.add_argument("--data", default="data/rainfall_flood_dataset.csv")
+    parser.add_argument("--chunksize", type=int, default=200_000, help="CSV rows per chunk")
+    parser.add_argument("--cache-dir", default="data/.train_cache")
+    parser.add_argument("--memory", choices=["quantile", "external"], default="quantile",
+                        help="in-memory QuantileDMatrix or disk-backed external memory")
+    parser.add_argument("--nthread", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--test-size", type=float, default=0.2, help="held-out fraction for the final score")
+    parser.add_argument("--val-size", type=float, default=0.1,
+                        help="fraction for early stopping and trial selection")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--out", default="ml")
+    parser.add_argument("--plots-dir", default="ml/plots")
+    parser.add_argument("--tune", action="store_true", help="run a parallel hyperparameter search")
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--trials-log", default=None,
+                        help="JSONL checkpoint of finished trials (default: <cache>/tuning/trials.jsonl)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # ------------------------------
+    # Load Data (streamed + cached)
+    # ------------------------------
+    cache_dir = build_chunk_cache(Path(args.data), Path(args.cache_dir), args.chunksize,
+                                  args.test_size, args.val_size, args.seed)
+    if args.tune:
+        best = tune(args, cache_dir)
+        booster = xgb.Booster(model_file=best["model_file"])
+        params, rounds = best["params"], best["best_iteration"] + 1
+    else:
+        dtrain, dval = build_matrices(cache_dir, args.memory, args.nthread)
+        print("Dataset Loaded:", (dtrain.num_row(), dtrain.num_col()), "train,", dval.num_row(), "validation")
+
+        # ------------------------------
+        # Train XGBoost Model
+        # ------------------------------
+        params = dict(DEFAULT_PARAMS, nthread=args.nthread, seed=args.seed)
+        print(f"Training Model... (hist, {args.nthread} threads, {args.memory} memory)")
+        start = time.time()
+        booster = xgb.train(params, dtrain, num_boost_round=args.rounds,
+                            evals=[(dval, "validation")], verbose_eval=50)
+        print(f"Trained in {time.time() - start:.1f}s")
+        rounds = args.rounds
+
+    # ------------------------------
+    # Evaluation
+    # ------------------------------
+    acc, logloss, cm = evaluate(booster, cache_dir)
+    print(f"Test accuracy: {acc:.4f}   test logloss: {logloss:.5f}")
+    print("\nClassification Report:\n", classification_summary(cm))
+    print("Confusion matrix saved →", save_confusion_matrix(cm, Path(args.plots_dir)))
+
+    manifest = export_model(booster, Path(args.out), extra={
+        "params": params, "rounds": rounds, "test_accuracy": acc, "test_logloss": logloss,
+    })
+    print(f"🔥 Model successfully saved → {manifest}")
+    return 0
 
-os.makedirs("ml", exist_ok=True)
-joblib.dump(artifact, "ml/flood_xgb.joblib")
 
-print("🔥 Model successfully saved → ml/flood_xgb.joblib")
+if __name__ == "__main__":
+    sys.exit(main())